@@ -0,0 +1,97 @@
+"""
+存储后端基准：JSON 日志存储 与 SQLite 存储对比
+（打开、整体加载、单次保存的 p50 和最大值、整理存储的耗时）。
+按日、按月、按类型的查询对两种后端都由 RecordStore 的内存索引完成，不在这里比较
+
+用法: python scripts/bench_backends.py
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+from bench_common import percentile, synthetic_records, timeit
+from yj_storage import RecordStore, open_storage
+
+SIZES = [1000, 10000, 100000]
+
+
+def check_pending_visible(backend):
+    """组提交窗口内刚保存的记录，按类型筛选时也要能查到（落盘前后一致），之后的写入增量进入类型索引"""
+    scheduled = []
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = open_storage(backend, os.path.join(tmp, 'period_tracker_data.json'))
+        store = RecordStore(storage, commit_window=0.5,
+                            scheduler=lambda callback, delay: scheduled.append(callback))
+        store.append({'date': '2024-01-01', 'type': 'mood_symptom', 'mood': '😊 开心',
+                      'symptoms': ['腹痛'], 'timestamp': '2024-01-01 08:00:00'})
+        assert len(store.records()) == 1
+        assert len(store.records_of_type('mood_symptom')) == 1, backend
+        version = store.version
+        for callback in scheduled:
+            callback()
+        assert store.version == version
+        assert len(store.records_of_type('mood_symptom')) == 1, backend
+        # 按类型的索引建好之后，新写入的记录增量加入
+        store.append({'date': '2024-01-02', 'type': 'intimacy', 'intimacy_type': '戴套',
+                      'note': '', 'timestamp': '2024-01-02 21:00:00'})
+        for record_type in ('mood_symptom', 'intimacy', 'period'):
+            assert store.records_of_type(record_type) == \
+                tuple(r for r in store.records() if r.type == record_type), (backend, record_type)
+        if hasattr(storage, 'close'):
+            storage.close()
+
+
+def bench_backend(backend, records):
+    extra = synthetic_records(50, seed=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'period_tracker_data.json')
+        with open(data_file, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False)
+
+        # SQLite 首次打开会导入 JSON，单独计时
+        open_time = timeit(lambda: open_storage(backend, data_file))[0]
+        storage = open_storage(backend, data_file)
+        store = RecordStore(storage)
+        load_time = timeit(store.records)[0]
+
+        save_times = []
+        for record in extra:
+            save_times += timeit(lambda: store.append(record))
+
+        # 日志存储的整理是把日志合并进快照（重写整个快照），SQLite 只更新查询统计信息
+        maintain = storage.compact if backend == 'journal' else storage.compact_if_needed
+        maintain_time = timeit(maintain)[0]
+        if hasattr(storage, 'close'):
+            storage.close()
+
+    return {
+        'open': open_time,
+        'load': load_time,
+        'save': percentile(save_times, 50),
+        'save_max': max(save_times),
+        'maintain': maintain_time,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.parse_args()
+
+    for backend in ('journal', 'sqlite'):
+        check_pending_visible(backend)
+    print("一致性校验通过（组提交窗口内按类型筛选）")
+
+    columns = ['open', 'load', 'save', 'save_max', 'maintain']
+    print(f"{'记录数':>8} {'后端':>8} | " + ' | '.join(f'{c:>9}' for c in columns) + '   (毫秒)')
+    for n in SIZES:
+        records = synthetic_records(n)
+        for backend in ('journal', 'sqlite'):
+            result = bench_backend(backend, records)
+            print(f"{n:>10} {backend:>8} | " +
+                  ' | '.join(f'{result[c] * 1e3:>9.3f}' for c in columns))
+
+
+if __name__ == '__main__':
+    main()
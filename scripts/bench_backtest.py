@@ -0,0 +1,75 @@
+"""
+回测引擎：与"在每个历史时刻重新构造 CyclePredictor"的朴素回测比对误差，再比较两者耗时
+
+用法: python scripts/bench_backtest.py [--histories 200] [--periods 2000]
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime
+
+import bench_common  # noqa: F401  （设置导入路径）
+from yj_backtest import backtest_starts
+from yj_predictor import MAX_CYCLE, MIN_CYCLE, CyclePredictor
+from yj_storage import PeriodRecord
+
+
+def random_starts(count, rng):
+    starts = []
+    day = 730000
+    for _ in range(count):
+        starts.append(day)
+        day += rng.choice([0, rng.randint(5, 19), rng.randint(21, 40), rng.randint(21, 40),
+                           rng.randint(46, 90)])
+    return starts
+
+
+def naive_backtest(starts, plausible_only=True):
+    results = []
+    for m in range(2, len(starts)):
+        actual = starts[m] - starts[m - 1]
+        if plausible_only and not MIN_CYCLE <= actual <= MAX_CYCLE:
+            continue
+        predictor = CyclePredictor([PeriodRecord(s, None) for s in starts[:m]])
+        predicted = predictor.predict_next_period()[0]
+        error = (predicted - datetime.fromordinal(starts[m])).total_seconds() / 86400
+        results.append((m, error))
+    return results
+
+
+def check_parity(histories, rng):
+    for _ in range(histories):
+        starts = random_starts(rng.randint(0, 40), rng)
+        for plausible_only in (True, False):
+            fast = backtest_starts(starts, plausible_only=plausible_only)
+            slow = naive_backtest(starts, plausible_only)
+            assert [m for m, _ in fast] == [m for m, _ in slow], starts
+            # 朴素版经过 timedelta 舍入到微秒，允许 1e-6 天的差异
+            for (_, a), (_, b) in zip(fast, slow):
+                assert abs(a - b) < 1e-6, (starts, a, b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--histories', type=int, default=200)
+    parser.add_argument('--periods', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    check_parity(args.histories, rng)
+    print(f"一致性校验通过（{args.histories} 段随机历史）")
+
+    for n in (args.periods // 4, args.periods // 2, args.periods):
+        starts = random_starts(n, rng)
+        t0 = time.perf_counter()
+        naive_backtest(starts)
+        naive = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        backtest_starts(starts)
+        fast = time.perf_counter() - t0
+        print(f"{n} 次经期: 朴素回测 {naive * 1e3:.1f}ms, 前缀和回测 {fast * 1e3:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+日历基准：在 10 年历史数据上连续翻月，统计每次取月份标记的耗时
+
+用法: python scripts/bench_calendar.py [--records 2000]
+"""
+
+import argparse
+import calendar
+import os
+import tempfile
+import time
+
+from bench_common import percentile, synthetic_records
+from yj_storage import JournalStorage, RecordStore
+
+FRAME_MS = 1000 / 60
+
+
+def month_cells(store, year, month):
+    """与 MainCalendarScreen.update_calendar 相同的 42 格计算（不含控件）"""
+    first_weekday, days_in_month = calendar.monthrange(year, month)
+    start_weekday = (first_weekday + 1) % 7
+    period_mask, mood_mask, intimacy_mask = store.month_flags(year, month)
+    cells = [None] * start_weekday
+    for day in range(1, days_in_month + 1):
+        bit = 1 << (day - 1)
+        cells.append((day, bool(period_mask & bit), bool(mood_mask & bit), bool(intimacy_mask & bit)))
+    cells += [None] * (42 - len(cells))
+    return cells
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=2000)
+    args = parser.parse_args()
+
+    records = synthetic_records(args.records)
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = JournalStorage(os.path.join(tmp, 'period_tracker_data.json'))
+        for record in records:
+            storage.append(record)
+        store = RecordStore(storage)
+        store.records()
+
+        t0 = time.perf_counter()
+        store.month_flags(2000, 1)
+        build = time.perf_counter() - t0
+
+        times = []
+        for year in range(2000, 2010):
+            for month in range(1, 13):
+                t0 = time.perf_counter()
+                month_cells(store, year, month)
+                times.append(time.perf_counter() - t0)
+
+    print(f"记录数 {len(records)}，位图构建 {build * 1e3:.2f}ms（每个数据版本一次）")
+    print(f"翻月 120 次: p50 {percentile(times, 50) * 1e3:.3f}ms, "
+          f"最大 {max(times) * 1e3:.3f}ms (一帧 {FRAME_MS:.1f}ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+日历网格控件基准（需要 Kivy 和可用的窗口环境，无显示器时可用 xvfb-run）：
+比较"清空网格后新建 42 个日期格"与"复用 42 个日期格只重新绑定内容"两种刷新方式的
+耗时、内存分配块数和新增对象数，并统计两种网格的绘图指令数。
+旧方式使用原来每格自带 Color/Ellipse 指示点的按钮（LegacyDayButton，按原实现保留在本脚本中），
+新方式的指示点由网格的 Mesh 统一绘制
+
+用法: python scripts/bench_calendar_widgets.py [--months 120]
+"""
+
+import argparse
+import calendar
+import gc
+import os
+import time
+import tracemalloc
+from datetime import datetime
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from bench_common import percentile  # noqa: E402  （设置导入路径）
+from kivy.graphics import Color, Ellipse  # noqa: E402
+from kivy.metrics import dp, sp  # noqa: E402
+from kivy.uix.button import Button  # noqa: E402
+from kivy.uix.gridlayout import GridLayout  # noqa: E402
+
+from yj import CalendarDayButton, CalendarGrid  # noqa: E402
+
+
+class LegacyDayButton(Button):
+    """原来的日历日期按钮：每个有记录的格子各自创建 Color + Ellipse 指示点"""
+    
+    def __init__(self, date, has_period=False, has_mood=False, has_intimacy=False, **kwargs):
+        super().__init__(**kwargs)
+        self.date = date
+        self.has_period = has_period
+        self.has_mood = has_mood
+        self.has_intimacy = has_intimacy
+        self.background_normal = ''
+        self.background_color = (0.95, 0.95, 0.95, 1) if date else (0.9, 0.9, 0.9, 0.5)
+        self.color = (0.3, 0.2, 0.25, 1)
+        self.font_size = sp(14)
+        self.font_name = 'simhei'
+        self.bold = True
+        
+        # 如果有记录，添加指示器
+        self.indicators = []
+        self.create_indicators()
+    
+    def create_indicators(self):
+        """创建记录指示器"""
+        indicator_size = dp(6)
+        spacing = dp(2)
+        
+        for shown, rgb in ((self.has_period, (0.93, 0.6, 0.73)),
+                           (self.has_mood, (0.8, 0.8, 0.4)),
+                           (self.has_intimacy, (0.6, 0.8, 0.6))):
+            if not shown:
+                continue
+            with self.canvas.after:
+                Color(*rgb, 1)
+                x_offset = len(self.indicators) * (indicator_size + spacing)
+                self.indicators.append(
+                    Ellipse(pos=(self.center_x - indicator_size/2 + x_offset, self.y + spacing),
+                           size=(indicator_size, indicator_size))
+                )
+    
+    def on_size(self, *args):
+        """当大小改变时更新指示器位置"""
+        for indicator in self.indicators:
+            indicator.pos = (self.center_x - dp(3), self.y + dp(2))
+
+
+def month_plan(year, month):
+    """42 格的 (date, 文本, 经期, 心情, 爱爱)，标记按日期伪随机生成"""
+    first_weekday, days_in_month = calendar.monthrange(year, month)
+    start_weekday = (first_weekday + 1) % 7
+    plan = []
+    for index in range(42):
+        day = index - start_weekday + 1
+        if 1 <= day <= days_in_month:
+            plan.append((datetime(year, month, day), str(day), day % 5 == 0, day % 3 == 0, day % 7 == 0))
+        else:
+            plan.append((None, '', False, False, False))
+    return plan
+
+
+def rebuild(grid, plan, on_click):
+    """旧方式：清空网格，每格新建按钮、指示点指令和闭包"""
+    grid.clear_widgets()
+    for date, text, has_period, has_mood, has_intimacy in plan:
+        btn = LegacyDayButton(date=date, has_period=has_period, has_mood=has_mood,
+                                has_intimacy=has_intimacy)
+        btn.text = text
+        if date is not None:
+            btn.bind(on_press=lambda instance, d=date: on_click(d))
+        grid.add_widget(btn)
+
+
+def rebind(grid, cells, plan):
+    """新方式：复用已有的 42 个日期格，指示点一次性重建"""
+    for cell, (date, text, has_period, has_mood, has_intimacy) in zip(cells, plan):
+        cell.rebind(date, text, has_period, has_mood, has_intimacy)
+    grid.update_indicators()
+
+
+def count_instructions(widget):
+    """控件树中 canvas.before/canvas/canvas.after 的指令总数"""
+    canvas = widget.canvas
+    total = len(canvas.children)
+    for group in (canvas.before, canvas.after):
+        total += len(group.children)
+    return total + sum(count_instructions(child) for child in widget.children)
+
+
+def measure(fn, plans):
+    """先单独计时，再在 tracemalloc 下重放一遍统计分配（分配跟踪会拖慢计时）"""
+    times = []
+    for plan in plans:
+        t0 = time.perf_counter()
+        fn(plan)
+        times.append(time.perf_counter() - t0)
+
+    gc.collect()
+    objects_before = len(gc.get_objects())
+    tracemalloc.start()
+    for plan in plans:
+        fn(plan)
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics('filename'))
+    gc.collect()
+    objects = len(gc.get_objects()) - objects_before
+    return times, blocks, objects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--months', type=int, default=120)
+    args = parser.parse_args()
+
+    plans = [month_plan(2000 + i // 12, i % 12 + 1) for i in range(args.months)]
+
+    old_grid = GridLayout(cols=7)
+    rebuild(old_grid, plans[0], lambda d: None)
+    new_grid = CalendarGrid(cols=7)
+    cells = [CalendarDayButton() for _ in range(42)]
+    for cell in cells:
+        new_grid.add_widget(cell)
+
+    results = [
+        ('新建 42 格', measure(lambda plan: rebuild(old_grid, plan, lambda d: None), plans)),
+        ('复用并重新绑定', measure(lambda plan: rebind(new_grid, cells, plan), plans)),
+    ]
+
+    for label, (times, blocks, objects) in results:
+        print(f"{label}: p50 {percentile(times, 50) * 1e3:.3f}ms, 最大 {max(times) * 1e3:.3f}ms, "
+              f"存活内存块 {blocks}, 新增对象 {objects}（{args.months} 次刷新）")
+    print(f"网格绘图指令数: 新建 {count_instructions(old_grid)}，复用 {count_instructions(new_grid)}")
+
+
+if __name__ == '__main__':
+    main()
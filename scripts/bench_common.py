@@ -0,0 +1,74 @@
+"""
+基准测试公共工具：生成合成记录、计时
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# 让 scripts/ 下的脚本可以直接导入仓库根目录的模块
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+MOODS = ['😊 开心', '😢 难过', '😠 生气', '😌 平静', '😫 疲惫', '😖 压力', '😍 兴奋', '😨 焦虑']
+SYMPTOMS = ['腹痛', '头痛', '背痛', '乳房胀痛', '疲劳', '情绪波动', '食欲变化', '其他']
+INTIMACY_TYPES = ['内射', '外射', '戴套', '避孕药', '其他']
+
+
+def synthetic_records(n, seed=0, start=datetime(2000, 1, 1)):
+    """生成 n 条合成记录：约 1/6 经期，其余为心情和爱爱记录"""
+    rng = random.Random(seed)
+    records = []
+    day = start
+    while len(records) < n:
+        duration = rng.randint(3, 7)
+        records.append({
+            'start_date': day.strftime('%Y-%m-%d'),
+            'end_date': (day + timedelta(days=duration - 1)).strftime('%Y-%m-%d'),
+            'type': 'period',
+            'timestamp': day.strftime('%Y-%m-%d %H:%M:%S'),
+        })
+        cycle = rng.randint(24, 34)
+        for _ in range(5):
+            if len(records) >= n:
+                break
+            d = day + timedelta(days=rng.randrange(cycle))
+            if rng.random() < 0.7:
+                records.append({
+                    'date': d.strftime('%Y-%m-%d'),
+                    'mood': rng.choice(MOODS),
+                    'symptoms': rng.sample(SYMPTOMS, rng.randint(0, 3)),
+                    'type': 'mood_symptom',
+                    'timestamp': d.strftime('%Y-%m-%d %H:%M:%S'),
+                })
+            else:
+                records.append({
+                    'date': d.strftime('%Y-%m-%d'),
+                    'type': 'intimacy',
+                    'intimacy_type': rng.choice(INTIMACY_TYPES),
+                    'note': '',
+                    'timestamp': d.strftime('%Y-%m-%d %H:%M:%S'),
+                })
+        day += timedelta(days=cycle)
+    return records[:n]
+
+
+def timeit(fn, repeat=1):
+    """返回每次调用的耗时列表（秒）"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    k = min(len(values) - 1, max(0, int(round(q / 100 * (len(values) - 1)))))
+    return values[k]
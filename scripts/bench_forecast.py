@@ -0,0 +1,79 @@
+"""
+多周期预测与日历叠加层：校验 iter_forecast 的第一项与 predict_next_period 一致、
+叠加层位图与逐月直接计算一致，再比较"每翻一个月重新预测"与"叠加层查表"的耗时
+
+用法: python scripts/bench_forecast.py [--records 3000] [--months 24]
+"""
+
+import argparse
+import calendar
+import time
+from datetime import datetime, timedelta
+
+import bench_common
+from yj_predictor import CyclePredictor, ForecastOverlay, MAX_FORECAST_CYCLES
+
+
+def months_after(day, count):
+    year, month = day.year, day.month
+    for _ in range(count):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def naive_month(records, year, month):
+    """每次都重新构造预测器并展开周期，逐日判断"""
+    predictor = CyclePredictor(records)
+    days = calendar.monthrange(year, month)[1]
+    masks = [0, 0, 0]
+    for cycle in predictor.iter_forecast(MAX_FORECAST_CYCLES):
+        start, end, ovulation, (fertile_start, fertile_end) = cycle
+        ranges = [(start, end), (ovulation, ovulation), (fertile_start, fertile_end)]
+        for kind, (lo, hi) in enumerate(ranges):
+            for d in range(1, days + 1):
+                ordinal = datetime(year, month, d).toordinal()
+                if lo.toordinal() <= ordinal <= hi.toordinal():
+                    masks[kind] |= 1 << (d - 1)
+    return tuple(masks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=3000)
+    parser.add_argument('--months', type=int, default=24)
+    args = parser.parse_args()
+
+    records = bench_common.synthetic_records(args.records)
+    predictor = CyclePredictor(records)
+    assert next(predictor.iter_forecast()) == predictor.predict_next_period()
+
+    first = predictor.period_starts[-1] + timedelta(days=1)
+    months = list(months_after(first, args.months))
+    overlay = ForecastOverlay(predictor.iter_forecast())
+    for year, month in months:
+        assert overlay.get(year, month) == naive_month(records, year, month), (year, month)
+    print(f"一致性校验通过（{len(months)} 个月）")
+
+    t0 = time.perf_counter()
+    for year, month in months:
+        naive_month(records, year, month)
+    naive = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    overlay = ForecastOverlay(CyclePredictor(records).iter_forecast())
+    for year, month in months:
+        overlay.get(year, month)
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for year, month in months:
+        overlay.get(year, month)
+    cached = time.perf_counter() - t0
+
+    n = len(months)
+    print(f"{args.records} 条记录, {n} 个月: 每月重新预测 {naive / n * 1e3:.3f}ms/月, "
+          f"叠加层首次 {build / n * 1e3:.3f}ms/月, 缓存后 {cached / n * 1e6:.2f}µs/月")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+增量预测器：按随机顺序逐条加入经期记录，每一步都与整体重算的 CyclePredictor 比对，
+再比较"每次新增后重算"与"增量更新"的耗时
+
+用法: python scripts/bench_incremental.py [--histories 300] [--periods 400]
+"""
+
+import argparse
+import random
+import time
+
+import bench_common  # noqa: F401  （设置导入路径）
+from yj_predictor import CyclePredictor, IncrementalCyclePredictor
+from yj_storage import PeriodRecord
+
+
+def random_periods(count, rng):
+    records = []
+    day = 730000
+    for _ in range(count):
+        duration = rng.randint(1, 12)
+        records.append(PeriodRecord(day, day + duration - 1))
+        day += rng.choice([0, rng.randint(5, 19), rng.randint(21, 40), rng.randint(21, 40),
+                           rng.randint(46, 90)])
+    rng.shuffle(records)
+    return records
+
+
+def snapshot(predictor):
+    return (predictor.get_cycle_statistics(),
+            predictor.calculate_weighted_average_cycle(),
+            predictor.predict_next_period())
+
+
+def check_parity(histories, rng):
+    for _ in range(histories):
+        records = random_periods(rng.randint(0, 30), rng)
+        incremental = IncrementalCyclePredictor()
+        for i, record in enumerate(records):
+            incremental.add(record)
+            expected = snapshot(CyclePredictor(records[:i + 1]))
+            assert snapshot(incremental) == expected, (records[:i + 1], snapshot(incremental), expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--histories', type=int, default=300)
+    parser.add_argument('--periods', type=int, default=400)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    check_parity(args.histories, rng)
+    print(f"一致性校验通过（{args.histories} 段随机历史，每次新增后比对）")
+
+    records = sorted(random_periods(args.periods, rng), key=lambda r: r.start)
+    t0 = time.perf_counter()
+    for i in range(1, len(records) + 1):
+        snapshot(CyclePredictor(records[:i]))
+    batch = time.perf_counter() - t0
+
+    incremental = IncrementalCyclePredictor()
+    t0 = time.perf_counter()
+    for record in records:
+        incremental.add(record)
+        snapshot(incremental)
+    inc = time.perf_counter() - t0
+
+    n = len(records)
+    print(f"{n} 次新增: 每次重算 {batch / n * 1e3:.3f}ms/次, 增量 {inc / n * 1e3:.3f}ms/次")
+
+
+if __name__ == '__main__':
+    main()
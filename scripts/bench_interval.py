@@ -0,0 +1,67 @@
+"""
+下次经期预测区间：检查同一种子结果可复现、10000 次重抽样的耗时预算（< 2ms），
+并在合成历史上统计实际开始日期落在 80%/95% 区间内的比例
+
+用法: python scripts/bench_interval.py [--histories 300] [--budget-ms 2]
+"""
+
+import argparse
+import random
+
+import bench_common
+from yj_predictor import INTERVAL_LEVELS, CyclePredictor, _resample_indices, bootstrap_cycle_interval
+from yj_storage import PeriodRecord
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--histories', type=int, default=300)
+    parser.add_argument('--budget-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    lengths = [rng.randint(24, 34) for _ in range(30)]
+    first = bootstrap_cycle_interval(lengths)
+    _resample_indices.cache_clear()
+    assert bootstrap_cycle_interval(lengths) == first
+    assert bootstrap_cycle_interval(lengths, seed=1) != first or len(set(lengths)) == 1
+    assert bootstrap_cycle_interval(lengths[:1]) is None
+    print(f"可复现性校验通过: {first}")
+
+    # 冷启动包含生成下标矩阵，热启动复用同一矩阵
+    cold = []
+    for seed in range(50):
+        _resample_indices.cache_clear()
+        cold.append(bench_common.timeit(lambda: bootstrap_cycle_interval(lengths, seed=seed), 1)[0])
+    warm = bench_common.timeit(lambda: bootstrap_cycle_interval(lengths), 200)
+    cold_p50 = bench_common.percentile(cold, 50) * 1e3
+    warm_p50 = bench_common.percentile(warm, 50) * 1e3
+    print(f"10000 次重抽样: 冷启动 p50 {cold_p50:.3f}ms, 复用下标矩阵 p50 {warm_p50:.3f}ms "
+          f"（预算 {args.budget_ms}ms）")
+    assert cold_p50 < args.budget_ms, cold_p50
+
+    hits = {level: 0 for level in INTERVAL_LEVELS}
+    total = 0
+    for _ in range(args.histories):
+        base = rng.uniform(25, 33)
+        noise = rng.uniform(0.5, 4)
+        day = 730000
+        starts = [day]
+        for _ in range(rng.randint(4, 20)):
+            day += round(base + rng.gauss(0, noise))
+            starts.append(day)
+        actual = day + round(base + rng.gauss(0, noise))
+        predictor = CyclePredictor([PeriodRecord(s, s + 4) for s in starts])
+        bounds = predictor.predict_next_period(interval=INTERVAL_LEVELS)[4]
+        if bounds is None:
+            continue
+        total += 1
+        for level, (low, high) in bounds.items():
+            if low.toordinal() <= actual <= high.toordinal():
+                hits[level] += 1
+    coverage = ', '.join(f"{level:.0%} 区间 {hits[level] / total:.1%}" for level in INTERVAL_LEVELS)
+    print(f"{total} 段合成历史的实际覆盖率: {coverage}")
+
+
+if __name__ == '__main__':
+    main()
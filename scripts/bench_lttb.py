@@ -0,0 +1,51 @@
+"""
+周期折线图降采样：检查 LTTB 保留首尾和最大/最小值、点数符合上限，
+并测量不同序列长度下降采样和标签稀疏化的耗时
+
+用法: python scripts/bench_lttb.py [--width 360]
+"""
+
+import argparse
+import random
+
+from bench_common import percentile, timeit
+from yj_analytics import lttb_indices, point_budget, thin_labels
+
+
+def check(rng):
+    for _ in range(2000):
+        n = rng.randint(0, 60)
+        values = [rng.randint(20, 45) for _ in range(n)]
+        threshold = rng.randint(0, 70)
+        indices = lttb_indices(values, threshold)
+        assert indices == sorted(set(indices)) and all(0 <= i < n for i in indices)
+        if n and 3 <= threshold < n:
+            assert indices[0] == 0 and indices[-1] == n - 1
+            assert values.index(min(values)) in indices and values.index(max(values)) in indices
+            assert len(indices) in (threshold, threshold + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--width', type=float, default=360, help='绘图区宽度（像素）')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    check(rng)
+    print("正确性校验通过（首尾、最大/最小值、点数）")
+
+    budget = point_budget(args.width, 8)
+    for n in (100, 1000, 10000, 100000):
+        values = [rng.randint(22, 40) for _ in range(n)]
+        times = timeit(lambda: lttb_indices(values, budget), 5)
+        indices = lttb_indices(values, budget)
+        xs = [i / (len(indices) - 1) * args.width for i in range(len(indices))]
+        label_times = timeit(lambda: thin_labels(xs, [24] * len(xs), 4), 5)
+        shown = len(thin_labels(xs, [24] * len(xs), 4))
+        print(f"{n} 个周期 -> {len(indices)} 点（上限 {budget}），LTTB p50 "
+              f"{percentile(times, 50) * 1e3:.2f}ms，标签 {shown} 个，稀疏化 "
+              f"{percentile(label_times, 50) * 1e3:.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
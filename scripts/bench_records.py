@@ -0,0 +1,87 @@
+"""
+记录模型基准：字典记录 与 带类型的 __slots__ 记录在 10 万条数据下的内存和 CPU 对比
+
+用法: python scripts/bench_records.py [--records 100000]
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+from bench_common import synthetic_records
+from yj_storage import MonthFlags, PeriodRecord, parse_record
+
+
+def legacy_pass(records):
+    """旧实现的典型一轮：提取经期开始日 + 平均经期长度，每次都用 strptime 解析"""
+    starts = []
+    lengths = []
+    for record in records:
+        if record.get('type') == 'period':
+            start = datetime.strptime(record['start_date'], '%Y-%m-%d')
+            end = datetime.strptime(record.get('end_date') or record['start_date'], '%Y-%m-%d')
+            starts.append(start)
+            lengths.append((end - start).days + 1)
+    return sorted(starts), sum(lengths) / len(lengths)
+
+
+def typed_pass(records):
+    """同样的计算，直接使用加载时解析好的日序号"""
+    periods = [r for r in records if isinstance(r, PeriodRecord)]
+    starts = [datetime.fromordinal(s) for s in sorted(r.start for r in periods)]
+    lengths = [r.end - r.start + 1 for r in periods]
+    return starts, sum(lengths) / len(lengths)
+
+
+def measure_memory(build):
+    gc.collect()
+    tracemalloc.start()
+    data = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=100000)
+    args = parser.parse_args()
+
+    text = json.dumps(synthetic_records(args.records), ensure_ascii=False)
+
+    # tracemalloc 会拖慢分配，内存和耗时分开测
+    dicts, dict_bytes = measure_memory(lambda: json.loads(text))
+    typed, typed_bytes = measure_memory(lambda: [parse_record(r) for r in json.loads(text)])
+
+    t0 = time.perf_counter()
+    json.loads(text)
+    dict_load = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    [parse_record(r) for r in json.loads(text)]
+    typed_load = time.perf_counter() - t0
+
+    assert legacy_pass(dicts) == typed_pass(typed)
+
+    t0 = time.perf_counter()
+    legacy_pass(dicts)
+    legacy_cpu = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    typed_pass(typed)
+    typed_cpu = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    MonthFlags.build(typed)
+    flags_cpu = time.perf_counter() - t0
+
+    print(f"记录数: {args.records}")
+    print(f"内存:   字典 {dict_bytes / 2**20:.1f} MiB, 带类型 {typed_bytes / 2**20:.1f} MiB")
+    print(f"加载:   字典 {dict_load * 1e3:.0f} ms, 带类型(含一次性解析) {typed_load * 1e3:.0f} ms")
+    print(f"每轮计算: 字典 {legacy_cpu * 1e3:.1f} ms, 带类型 {typed_cpu * 1e3:.1f} ms")
+    print(f"月份位图构建: {flags_cpu * 1e3:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+存储基准：比较旧的整文件重写与追加写日志的单次保存延迟（p50 和最大值），
+以及日志压缩的耗时。保存次数超过默认压缩阈值，每 --pause-every 次保存模拟一次
+切到后台（调用 compact_if_needed），压缩不计入保存延迟，单独报告
+
+用法: python scripts/bench_storage.py [--saves 600] [--pause-every 100]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from unittest import mock
+
+from bench_common import percentile, synthetic_records, timeit
+import yj_storage
+from yj_storage import FSYNC_NEVER, JournalStorage
+
+SIZES = [100, 1000, 10000, 100000]
+
+
+def legacy_save(path, record):
+    """旧实现：读取全部记录、追加一条、整文件重写"""
+    with open(path, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    records.append(record)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+
+
+class Crash(Exception):
+    pass
+
+
+def check_compaction_recovery():
+    """压缩前后内容相同的重复保存不会被丢弃；压缩在任何一次重命名/删除处崩溃，重新加载后记录都不多不少"""
+    a = {'date': '2024-01-01', 'type': 'intimacy', 'timestamp': '2024-01-01 21:00:00'}
+    b = {'date': '2024-01-02', 'type': 'intimacy', 'timestamp': '2024-01-02 21:00:00'}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'period_tracker_data.json')
+        storage = JournalStorage(path, compact_threshold=2, fsync=FSYNC_NEVER)
+        storage.append(a)
+        storage.append(b)
+        storage.compact_if_needed()
+        storage.append(b)   # 连点两次保存，时间戳只精确到秒
+        assert JournalStorage(path).load() == [a, b, b]
+        assert JournalStorage(path).load() == [a, b, b]
+
+    real_replace, real_remove = os.replace, os.remove
+    for crash_at in range(1, 6):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'period_tracker_data.json')
+            storage = JournalStorage(path, fsync=FSYNC_NEVER)
+            storage.append_many([a, b])
+            storage.compact()
+            storage.append_many([b, a])
+            expected = [a, b, b, a]
+
+            calls = []
+
+            def failing(real):
+                def op(*args):
+                    calls.append(args)
+                    if len(calls) == crash_at:
+                        raise Crash()
+                    return real(*args)
+                return op
+
+            with mock.patch.object(yj_storage.os, 'replace', failing(real_replace)), \
+                    mock.patch.object(yj_storage.os, 'remove', failing(real_remove)):
+                try:
+                    storage.compact()
+                except Crash:
+                    pass
+            assert JournalStorage(path).load(repair=False) == expected, crash_at
+            reopened = JournalStorage(path)
+            assert reopened.load() == expected, crash_at
+            reopened.append(b)
+            assert JournalStorage(path).load() == expected + [b], crash_at
+            assert not any(name.endswith(('.compacting', '.merged')) for name in os.listdir(tmp))
+
+
+def bench_size(n, saves, pause_every):
+    records = synthetic_records(n)
+    extra = synthetic_records(saves, seed=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'period_tracker_data.json')
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+        # 旧实现在大数据量下很慢，只取少量样本
+        legacy_n = max(3, min(saves, 200000 // n))
+        legacy = []
+        for record in extra[:legacy_n]:
+            legacy += timeit(lambda: legacy_save(path, record))
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+        storage = JournalStorage(path)
+        storage.load()
+        journal = []
+        compactions = []
+        for i, record in enumerate(extra, 1):
+            journal += timeit(lambda: storage.append(record))
+            if i % pause_every == 0:
+                pending = storage.journal_count
+                elapsed = timeit(storage.compact_if_needed)[0]
+                if pending >= storage.compact_threshold:
+                    compactions.append(elapsed)
+        replay = timeit(storage.load)[0]
+        if not compactions:
+            compactions = timeit(storage.compact)
+
+    return legacy, journal, compactions, replay
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--saves', type=int, default=600)
+    parser.add_argument('--pause-every', type=int, default=100)
+    args = parser.parse_args()
+
+    check_compaction_recovery()
+    print("一致性校验通过（压缩后的重复保存、压缩中途崩溃后的恢复）")
+
+    print(f"{'记录数':>8} | {'旧保存 p50':>12} | {'旧保存最大':>12} | {'日志保存 p50':>12} | "
+          f"{'日志保存 p99':>12} | {'日志保存最大':>12} | {'压缩':>10} | {'启动重放':>10}")
+    for n in SIZES:
+        legacy, journal, compactions, replay = bench_size(n, args.saves, args.pause_every)
+        print(f"{n:>10} | {percentile(legacy, 50) * 1e3:>10.3f}ms | {max(legacy) * 1e3:>10.3f}ms | "
+              f"{percentile(journal, 50) * 1e3:>10.3f}ms | "
+              f"{percentile(journal, 99) * 1e3:>10.3f}ms | {max(journal) * 1e3:>10.3f}ms | "
+              f"{max(compactions) * 1e3:>8.1f}ms | {replay * 1e3:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
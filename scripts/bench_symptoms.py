@@ -0,0 +1,95 @@
+"""
+症状频率索引：与原来逐条扫描的 analyze_symptoms 比对（全部时间和最近 3/6/12 个月，
+包括经由 RecordStore 逐条写入后的增量结果），再比较两者的耗时
+
+用法: python scripts/bench_symptoms.py [--records 20000]
+"""
+
+import argparse
+import os
+import tempfile
+from collections import defaultdict
+from datetime import date
+
+from bench_common import percentile, synthetic_records, timeit
+from yj_storage import JournalStorage, MoodSymptomRecord, RecordStore, SymptomIndex, as_records
+
+
+def scan_top(records, months=None, today=None):
+    """原来的实现：逐条扫描、清理文本、完整排序后取前 5"""
+    if months is not None:
+        index = today.year * 12 + today.month - 1
+        first = index - months + 1
+    symptom_count = defaultdict(int)
+    for record in records:
+        if isinstance(record, MoodSymptomRecord):
+            if months is not None:
+                day = date.fromordinal(record.day)
+                if not first <= day.year * 12 + day.month - 1 <= index:
+                    continue
+            for symptom in record.symptoms:
+                clean_symptom = symptom.replace('其他: ', '').strip()
+                if clean_symptom:
+                    symptom_count[clean_symptom] += 1
+    return dict(sorted(symptom_count.items(), key=lambda x: x[1], reverse=True)[:5])
+
+
+def make_records(n):
+    raw = synthetic_records(n)
+    # 加一些带"其他: "前缀和空白的症状
+    for i, record in enumerate(raw):
+        if record.get('type') == 'mood_symptom' and i % 7 == 0:
+            record['symptoms'] = list(record['symptoms']) + ['其他: 失眠', '  ']
+    return raw
+
+
+def check_parity(raw, windows):
+    """整体构建和逐条写入两种方式都与逐条扫描一致（含次数相同时的先后顺序），
+    today 取最后一条记录所在日期和数据中段的一天"""
+    records = as_records(raw)
+    days = sorted(r.day for r in records if isinstance(r, MoodSymptomRecord))
+    todays = [date.fromordinal(days[-1]), date.fromordinal(days[len(days) // 2])]
+
+    index = SymptomIndex.build(records)
+    for today in todays:
+        for months in windows:
+            assert index.top(5, months, today) == scan_top(records, months, today), \
+                (len(raw), months, today)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RecordStore(JournalStorage(os.path.join(tmp, 'period_tracker_data.json')))
+        store.top_symptoms()
+        for i, record in enumerate(raw[:2000]):
+            store.append(record)
+            if i % 97 == 0:
+                seen = as_records(raw[:i + 1])
+                for months in windows:
+                    assert store.top_symptoms(5, months, todays[0]) == \
+                        scan_top(seen, months, todays[0]), (len(raw), i, months)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=20000)
+    args = parser.parse_args()
+
+    windows = (None, 3, 6, 12)
+    # 数据少时次数相同的症状多，先在几种规模上校验
+    for n in sorted({300, 1000, 3000, args.records}):
+        check_parity(make_records(n), windows)
+    print("一致性校验通过（整体构建与逐条写入，全部及 3/6/12 个月，多种记录数）")
+
+    records = as_records(make_records(args.records))
+    today = date.fromordinal(max(r.day for r in records if isinstance(r, MoodSymptomRecord)))
+    index = SymptomIndex.build(records)
+
+    for months in windows:
+        scan = timeit(lambda: scan_top(records, months, today), 5)
+        indexed = timeit(lambda: index.top(5, months, today), 50)
+        label = '全部' if months is None else f'{months} 个月'
+        print(f"{len(records)} 条记录，{label}: 扫描 p50 {percentile(scan, 50) * 1e3:.2f}ms, "
+              f"索引 p50 {percentile(indexed, 50) * 1e6:.1f}µs")
+
+
+if __name__ == '__main__':
+    main()
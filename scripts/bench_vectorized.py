@@ -0,0 +1,96 @@
+"""
+向量化批量预测：先与逐个用户的 CyclePredictor 做一致性校验，再比较吞吐量
+
+用法: python scripts/bench_vectorized.py [--users 10000] [--check 2000]
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import bench_common  # noqa: F401  （设置导入路径）
+from yj_predictor import CyclePredictor, batch_cycle_statistics, pack_period_starts
+from yj_storage import PeriodRecord
+
+SCALAR_KEYS = ['avg_cycle', 'min_cycle', 'max_cycle', 'std_cycle', 'cycle_count', 'irregularity']
+
+
+def random_histories(users, seed=0):
+    """随机经期开始日期：包含正常周期、过短/过长的无效间隔、重复日期和空历史"""
+    rng = random.Random(seed)
+    histories = []
+    for _ in range(users):
+        day = datetime(2015, 1, 1) + timedelta(days=rng.randrange(365))
+        starts = []
+        for _ in range(rng.choice([0, 1, 2, 3, 5, 12, 40])):
+            starts.append(day)
+            roll = rng.random()
+            if roll < 0.05:
+                gap = 0
+            elif roll < 0.15:
+                gap = rng.randint(5, 19)
+            elif roll < 0.25:
+                gap = rng.randint(46, 90)
+            else:
+                gap = rng.randint(21, 40)
+            day += timedelta(days=gap)
+        rng.shuffle(starts)
+        histories.append(starts)
+    return histories
+
+
+def predictor_for(starts):
+    return CyclePredictor([PeriodRecord(d.toordinal(), d.toordinal() + 4) for d in starts])
+
+
+def check_parity(histories):
+    result = batch_cycle_statistics(pack_period_starts(histories))
+    for row, starts in enumerate(histories):
+        predictor = predictor_for(starts)
+        stats = predictor.get_cycle_statistics()
+        assert bool(stats) == bool(result['has_stats'][row]), row
+        for key in SCALAR_KEYS if stats else []:
+            assert stats[key] == result[key][row], (row, key, stats[key], result[key][row])
+        assert predictor.calculate_weighted_average_cycle() == result['weighted_cycle'][row], row
+        next_start = predictor.predict_next_period()[0]
+        vector_start = result['next_period_start'][row]
+        if next_start is None:
+            assert np.isnat(vector_start), row
+        else:
+            assert np.datetime64(next_start, 'us') == vector_start, (row, next_start, vector_start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--check', type=int, default=2000)
+    args = parser.parse_args()
+
+    check_parity(random_histories(args.check, seed=1))
+    print(f"一致性校验通过（{args.check} 个用户）")
+
+    histories = random_histories(args.users)
+
+    t0 = time.perf_counter()
+    for starts in histories:
+        predictor = predictor_for(starts)
+        predictor.get_cycle_statistics()
+        predictor.calculate_weighted_average_cycle()
+    scalar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    matrix = pack_period_starts(histories)
+    packed = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    batch_cycle_statistics(matrix)
+    vector = time.perf_counter() - t0
+
+    print(f"{args.users} 个用户: 逐个计算 {scalar * 1e3:.0f}ms ({args.users / scalar:.0f} 用户/秒), "
+          f"向量化 {vector * 1e3:.0f}ms ({args.users / vector:.0f} 用户/秒, 打包另计 {packed * 1e3:.0f}ms)")
+
+
+if __name__ == '__main__':
+    main()
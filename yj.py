@@ -50,12 +50,11 @@ else:
     print("警告: 未找到系统字体文件!")
 # *****************************************
 
-import json
 import os
 import math
 import random
 from datetime import datetime, timedelta
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
@@ -68,15 +67,29 @@ from kivy.uix.popup import Popup
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.core.window import Window
 from kivy.graphics import Color, RoundedRectangle, Line, Ellipse, Rectangle
-from kivy.graphics import InstructionGroup
-from kivy.metrics import dp, sp
+from kivy.graphics import InstructionGroup, Mesh, PopMatrix, PushMatrix, Scale, Translate
+from kivy.graphics import ClearBuffers, ClearColor, Fbo
+from kivy.graphics.texture import Texture
+from kivy.core.text import Label as CoreLabel
+from kivy.metrics import Metrics, dp, sp
 from kivy.clock import Clock
 from kivy.properties import StringProperty, ListProperty, NumericProperty, BooleanProperty, ObjectProperty
 from kivy.uix.behaviors import ButtonBehavior
 from kivy.uix.image import Image
 from kivy.uix.widget import Widget
 import calendar as py_calendar
-import numpy as np
+from functools import lru_cache
+from yj_analytics import (
+    heatmap_pixels, lttb_indices, phase_summary, point_budget, symptom_mood_cycle_analysis,
+    thin_labels,
+)
+from yj_predictor import INTERVAL_LEVELS, ForecastOverlay, IncrementalCyclePredictor, PredictionCache
+from yj_storage import (
+    IntimacyRecord, MoodSymptomRecord, PeriodRecord, RecordStore, open_storage
+)
+
+# 调试模式（环境变量 YJ_DEBUG=1），统计弹窗中显示缓存命中率
+DEBUG = bool(os.environ.get('YJ_DEBUG'))
 
 # 设置窗口大小
 Window.size = (400, 700)
@@ -149,392 +162,729 @@ class PrettyTextInput(TextInput):
         self.rect.size = (self.size[0]+dp(8), self.size[1]+dp(8))
 
 # ============================================
-# 智能预测算法类
+# 统计图表类
 # ============================================
 
-class CyclePredictor:
-    """智能周期预测算法"""
-    
-    def __init__(self, records):
-        self.records = records
-        self.period_starts = self.extract_period_starts()
-        
-    def extract_period_starts(self):
-        """提取所有经期开始日期"""
-        starts = []
-        for record in self.records:
-            if record.get('type') == 'period':
-                start_date_str = record.get('start_date')
-                if start_date_str:
-                    try:
-                        start_date = datetime.strptime(start_date_str, '%Y-%m-%d')
-                        starts.append(start_date)
-                    except ValueError:
-                        continue
-        return sorted(starts)
-    
-    def calculate_weighted_average_cycle(self, n_recent=6):
-        """计算加权平均周期长度（最近的数据权重更高）"""
-        if len(self.period_starts) < 2:
-            return 28  # 默认周期
-        
-        cycle_lengths = []
-        for i in range(1, len(self.period_starts)):
-            days_diff = (self.period_starts[i] - self.period_starts[i-1]).days
-            if 20 <= days_diff <= 45:  # 合理的周期范围
-                cycle_lengths.append((days_diff, i))  # 保存周期长度和索引
-        
-        if not cycle_lengths:
-            return 28
-        
-        # 计算权重：最近的数据权重更高
-        weights = []
-        values = []
-        
-        for length, idx in cycle_lengths[-n_recent:]:  # 只考虑最近的n个周期
-            weight = (idx / len(self.period_starts)) * 2 + 0.5  # 最近的数据权重更高
-            weights.append(weight)
-            values.append(length)
-        
-        # 加权平均
-        weighted_sum = sum(w * v for w, v in zip(weights, values))
-        total_weight = sum(weights)
-        
-        return weighted_sum / total_weight if total_weight > 0 else 28
-    
-    def predict_next_period(self):
-        """预测下一个经期"""
-        if len(self.period_starts) < 2:
-            return None, None, None, None
-        
-        avg_cycle = self.calculate_weighted_average_cycle()
-        last_period_start = self.period_starts[-1]
-        
-        # 预测下一个经期开始日期
-        next_period_start = last_period_start + timedelta(days=avg_cycle)
-        
-        # 预测排卵期（基于黄体期通常为14天）
-        ovulation_date = next_period_start - timedelta(days=14)
-        
-        # 预测易孕期（排卵期前后几天）
-        fertile_start = ovulation_date - timedelta(days=5)
-        fertile_end = ovulation_date + timedelta(days=1)
-        
-        # 预测经期结束日期（基于历史平均经期长度）
-        avg_period_length = self.calculate_avg_period_length()
-        next_period_end = next_period_start + timedelta(days=avg_period_length - 1)
-        
-        return next_period_start, next_period_end, ovulation_date, (fertile_start, fertile_end)
-    
-    def calculate_avg_period_length(self):
-        """计算平均经期长度"""
-        lengths = []
-        for record in self.records:
-            if record.get('type') == 'period':
-                start_str = record.get('start_date')
-                end_str = record.get('end_date') or start_str
-                if start_str and end_str:
-                    try:
-                        start = datetime.strptime(start_str, '%Y-%m-%d')
-                        end = datetime.strptime(end_str, '%Y-%m-%d')
-                        length = (end - start).days + 1
-                        if 2 <= length <= 10:  # 合理的经期长度范围
-                            lengths.append(length)
-                    except ValueError:
-                        continue
-        
-        return sum(lengths) / len(lengths) if lengths else 5
-    
-    def get_cycle_statistics(self):
-        """获取周期统计数据"""
-        if len(self.period_starts) < 2:
-            return {}
-        
-        # 计算周期长度
-        cycle_lengths = []
-        for i in range(1, len(self.period_starts)):
-            days_diff = (self.period_starts[i] - self.period_starts[i-1]).days
-            if 20 <= days_diff <= 45:
-                cycle_lengths.append(days_diff)
-        
-        if not cycle_lengths:
-            return {}
-        
-        # 计算统计数据
-        stats = {
-            'avg_cycle': sum(cycle_lengths) / len(cycle_lengths),
-            'min_cycle': min(cycle_lengths),
-            'max_cycle': max(cycle_lengths),
-            'std_cycle': np.std(cycle_lengths) if len(cycle_lengths) > 1 else 0,
-            'cycle_count': len(cycle_lengths),
-            'cycle_lengths': cycle_lengths,
-            'irregularity': self.calculate_irregularity_score(cycle_lengths)
-        }
-        
-        return stats
-    
-    def calculate_irregularity_score(self, cycle_lengths):
-        """计算周期不规律性评分（0-100，越高越不规律）"""
-        if len(cycle_lengths) < 3:
-            return 0
-        
-        # 计算相邻周期差异
-        diffs = []
-        for i in range(1, len(cycle_lengths)):
-            diffs.append(abs(cycle_lengths[i] - cycle_lengths[i-1]))
-        
-        avg_diff = sum(diffs) / len(diffs)
-        max_possible_diff = 25  # 最大可能的周期差异
-        
-        # 将平均差异转换为0-100的评分
-        score = min(100, (avg_diff / max_possible_diff) * 100)
-        return round(score, 1)
+@lru_cache(maxsize=256)
+def text_texture(text, font_size):
+    """渲染文字纹理（按文字和字号缓存），图表用 Rectangle 显示，不再为每段文字创建 Label
+
+    文字为白色，显示颜色由之前的 Color 指令决定。
+    """
+    label = CoreLabel(text=text, font_size=font_size, font_name='simhei')
+    label.refresh()
+    return label.texture
 
-# ============================================
-# 统计图表类
-# ============================================
 
 class CycleChart(Widget):
-    """周期长度折线图"""
+    """周期长度折线图
+
+    完整序列保存在 cycle_lengths 中，画出的是视窗 [view_start, view_end) 内按绘图宽度
+    用 LTTB 降采样后的点（保留最大、最小值）。几何在 0-1 坐标中计算，只在数据、视窗或
+    点数上限变化时重建绘图指令；位置和尺寸变化合并到下一帧，只缩放已有指令，
+    重叠的数值和横轴标签在缩放时隐藏。支持拖动平移、双指缩放、滚轮缩放和双击复原。
+    """
+    
+    MIN_VIEW = 2  # 视窗内至少保留的周期数
     
     def __init__(self, cycle_lengths, **kwargs):
         super().__init__(**kwargs)
-        self.cycle_lengths = cycle_lengths
         self.size_hint = (1, 1)
-        self.bind(pos=self.draw_chart, size=self.draw_chart)
+        self._touches = {}
+        self._pan_remainder = 0.0
+        # 一次布局中的多次 pos/size 事件只触发一次重绘
+        self.redraw = Clock.create_trigger(self.draw_chart)
+        self.bind(pos=self.redraw, size=self.redraw)
+        self.set_data(cycle_lengths)
     
-    def draw_chart(self, *args):
+    def set_data(self, cycle_lengths):
+        """换数据：视窗复原为整个序列，绘图指令在下次重绘时重建"""
+        self.cycle_lengths = list(cycle_lengths or [])
+        self.view_start, self.view_end = 0, len(self.cycle_lengths)
+        self.built_key = None
+        self.redraw()
+    
+    def build(self, budget):
+        """按当前视窗和点数上限降采样，计算归一化几何、取文字纹理并重建绘图指令"""
         self.canvas.clear()
         
-        if not self.cycle_lengths or len(self.cycle_lengths) < 2:
+        if len(self.cycle_lengths) < 2:
+            self.message = text_texture('需要更多数据', sp(14))
             with self.canvas:
                 Color(0.7, 0.7, 0.7, 1)
-                Label(text='需要更多数据', pos=self.pos, size=self.size)
+                self.message_rect = Rectangle(texture=self.message, size=self.message.size)
             return
+        self.message = None
         
+        # 视窗内的数据范围（用完整数据，而不是降采样后的点）
+        view = self.cycle_lengths[self.view_start:self.view_end]
+        min_val = min(view)
+        max_val = max(view)
+        val_range = max_val - min_val
+        last = len(view) - 1
+        sample = lttb_indices(view, budget)
+        
+        # 0-1 坐标下的数据点，数据为常数时画在底部
+        self.unit_points = [
+            (i / last, (view[i] - min_val) / val_range if val_range > 0 else 0)
+            for i in sample
+        ]
+        # 稀疏化标签时优先保留最大、最小值
+        self.label_keep = [sample.index(view.index(min_val)), sample.index(view.index(max_val))]
+        value_textures = [text_texture(str(view[i]), sp(10)) for i in sample]
+        x_textures = [text_texture(f"第{self.view_start + i + 1}次", sp(10)) for i in sample]
+        y_textures = [text_texture(f"{int(min_val + (i * val_range / 4))}天", sp(10)) for i in range(5)]
+        
+        with self.canvas:
+            # 坐标轴
+            Color(0.5, 0.5, 0.5, 0.8)
+            self.x_axis = Line(width=1.5)
+            self.y_axis = Line(width=1.5)
+            
+            # 水平网格线
+            Color(0.8, 0.8, 0.8, 0.3)
+            self.grid_lines = [Line(width=1) for _ in range(5)]
+            
+            # 折线和数据点
+            Color(0.93, 0.6, 0.73, 1)
+            self.line = Line(width=2.5)
+            self.dots = [Ellipse(size=(dp(6), dp(6))) for _ in sample]
+            
+            # 数值和坐标轴标签
+            Color(0.4, 0.2, 0.3, 1)
+            self.value_rects = [Rectangle(texture=t, size=t.size) for t in value_textures]
+            self.x_label_rects = [Rectangle(texture=t, size=t.size) for t in x_textures]
+            self.y_label_rects = [Rectangle(texture=t, size=t.size) for t in y_textures]
+    
+    def draw_chart(self, *args):
+        """按当前位置和尺寸缩放已有指令（视窗或点数上限变了才重建）"""
         # 计算图表参数
         x_margin = dp(40)
         y_margin = dp(30)
         chart_width = self.width - 2 * x_margin
         chart_height = self.height - 2 * y_margin
         
+        # 数据点之间至少留 8dp
+        budget = point_budget(max(chart_width, 0), dp(8))
+        key = (len(self.cycle_lengths), self.view_start, self.view_end, budget)
+        if key != self.built_key:
+            self.build(budget)
+            self.built_key = key
+        
+        if self.message is not None:
+            self.message_rect.pos = (self.center_x - self.message.width / 2,
+                                     self.center_y - self.message.height / 2)
+            return
+        
         if chart_width <= 0 or chart_height <= 0:
             return
         
-        # 数据范围
-        min_val = min(self.cycle_lengths)
-        max_val = max(self.cycle_lengths)
-        val_range = max_val - min_val
+        left = self.x + x_margin
+        bottom = self.y + y_margin
+        self.x_axis.points = [left, bottom, left + chart_width, bottom]
+        self.y_axis.points = [left, bottom, left, bottom + chart_height]
+        for i, grid_line in enumerate(self.grid_lines):
+            y = bottom + (i * chart_height / 4)
+            grid_line.points = [left, y, left + chart_width, y]
+        
+        points = []
+        xs = []
+        for (u, v), dot, value_rect, x_label_rect in zip(self.unit_points, self.dots,
+                                                         self.value_rects, self.x_label_rects):
+            x = left + u * chart_width
+            y = bottom + v * chart_height
+            points.extend([x, y])
+            xs.append(x)
+            dot.pos = (x - dp(3), y - dp(3))
+            # 文字居中放在原来 Label 的位置上
+            value_rect.pos = (x - value_rect.texture.width / 2, y + dp(13) - value_rect.texture.height / 2)
+            x_label_rect.pos = (x - x_label_rect.texture.width / 2,
+                                bottom - dp(12.5) - x_label_rect.texture.height / 2)
+        self.line.points = points
+        
+        # 会互相重叠的标签隐藏（尺寸设为 0）
+        for rects, gap, keep in ((self.value_rects, dp(2), self.label_keep),
+                                 (self.x_label_rects, dp(4), ())):
+            visible = set(thin_labels(xs, [r.texture.width for r in rects], gap, keep))
+            for i, rect in enumerate(rects):
+                rect.size = rect.texture.size if i in visible else (0, 0)
+        
+        for i, y_label_rect in enumerate(self.y_label_rects):
+            y = bottom + (i * chart_height / 4)
+            y_label_rect.pos = (left - dp(12.5) - y_label_rect.size[0] / 2, y - y_label_rect.size[1] / 2)
+    
+    # ---------- 视窗（缩放与平移） ----------
+    
+    def set_view(self, start, end):
+        """把视窗限制在数据范围内，有变化时重绘并返回 True"""
+        n = len(self.cycle_lengths)
+        span = max(min(self.MIN_VIEW, n), min(n, end - start))
+        start = max(0, min(start, n - span))
+        if (start, start + span) == (self.view_start, self.view_end):
+            return False
+        self.view_start, self.view_end = start, start + span
+        self.redraw()
+        return True
+    
+    def zoom(self, factor, anchor=0.5):
+        """以视窗内 anchor（0-1）处为中心缩放，factor > 1 为放大"""
+        span = self.view_end - self.view_start
+        new_span = max(self.MIN_VIEW, int(round(span / factor)))
+        center = self.view_start + anchor * (span - 1)
+        start = int(round(center - anchor * (new_span - 1)))
+        return self.set_view(start, start + new_span)
+    
+    def pan(self, fraction):
+        """按绘图宽度的比例平移（向右拖为正，显示更早的周期）"""
+        self._pan_remainder -= fraction * (self.view_end - self.view_start - 1)
+        shift = int(self._pan_remainder)
+        if not shift:
+            return False
+        self._pan_remainder -= shift
+        return self.set_view(self.view_start + shift, self.view_end + shift)
+    
+    def reset_view(self):
+        return self.set_view(0, len(self.cycle_lengths))
+    
+    def view_touch(self, phase, touch_id, x, y, touch=None):
+        """处理一次触摸（坐标与 self.pos 同一坐标系），视窗变化时返回 True
+
+        phase 为 'down'/'move'/'up'。单指拖动平移，双指缩放，滚轮缩放，双击复原。
+        """
+        chart_width = self.width - 2 * dp(40)
+        if chart_width <= 0 or len(self.cycle_lengths) < 2:
+            return False
+        anchor = min(1, max(0, (x - self.x - dp(40)) / chart_width))
+        
+        if phase == 'down':
+            if touch is not None and touch.is_mouse_scrolling:
+                return self.zoom(1.25 if touch.button == 'scrolldown' else 0.8, anchor)
+            if touch is not None and touch.is_double_tap:
+                return self.reset_view()
+            self._touches[touch_id] = (x, y)
+            return False
         
-        # 绘制坐标轴
-        with self.canvas:
-            Color(0.5, 0.5, 0.5, 0.8)
-            
-            # X轴
-            Line(points=[
-                self.x + x_margin, self.y + y_margin,
-                self.x + x_margin + chart_width, self.y + y_margin
-            ], width=1.5)
-            
-            # Y轴
-            Line(points=[
-                self.x + x_margin, self.y + y_margin,
-                self.x + x_margin, self.y + y_margin + chart_height
-            ], width=1.5)
-            
-            # 网格线
-            Color(0.8, 0.8, 0.8, 0.3)
-            # 水平网格线
-            for i in range(5):
-                y = self.y + y_margin + (i * chart_height / 4)
-                Line(points=[
-                    self.x + x_margin, y,
-                    self.x + x_margin + chart_width, y
-                ], width=1)
-            
-            # 绘制折线
-            if len(self.cycle_lengths) > 1:
-                points = []
-                for i, val in enumerate(self.cycle_lengths):
-                    x = self.x + x_margin + (i * chart_width / (len(self.cycle_lengths) - 1))
-                    y = self.y + y_margin + ((val - min_val) / val_range * chart_height) if val_range > 0 else self.y + y_margin
-                    points.extend([x, y])
-                
-                Color(0.93, 0.6, 0.73, 1)
-                Line(points=points, width=2.5)
-                
-                # 绘制数据点
-                for i, val in enumerate(self.cycle_lengths):
-                    x = self.x + x_margin + (i * chart_width / (len(self.cycle_lengths) - 1))
-                    y = self.y + y_margin + ((val - min_val) / val_range * chart_height) if val_range > 0 else self.y + y_margin
-                    
-                    Color(0.93, 0.6, 0.73, 1)
-                    Ellipse(pos=(x-dp(3), y-dp(3)), size=(dp(6), dp(6)))
-                    
-                    # 显示数值
-                    Color(0.4, 0.2, 0.3, 1)
-                    Label(text=str(val), font_size=sp(10),
-                          pos=(x-dp(8), y+dp(5)), size=(dp(16), dp(16)))
-            
-            # 添加坐标轴标签
-            Color(0.4, 0.2, 0.3, 1)
-            # X轴标签
-            for i in range(len(self.cycle_lengths)):
-                x = self.x + x_margin + (i * chart_width / max(1, len(self.cycle_lengths) - 1))
-                Label(text=f"第{i+1}次", font_size=sp(10),
-                      pos=(x-dp(10), self.y + y_margin - dp(20)), size=(dp(20), dp(15)))
-            
-            # Y轴标签
-            for i in range(5):
-                y = self.y + y_margin + (i * chart_height / 4)
-                val = min_val + (i * val_range / 4)
-                Label(text=f"{int(val)}天", font_size=sp(10),
-                      pos=(self.x + x_margin - dp(25), y-dp(8)), size=(dp(25), dp(16)))
+        if phase == 'up':
+            self._touches.pop(touch_id, None)
+            return False
+        
+        if touch_id not in self._touches:
+            return False
+        previous = dict(self._touches)
+        self._touches[touch_id] = (x, y)
+        if len(self._touches) == 1:
+            return self.pan((x - previous[touch_id][0]) / chart_width)
+        if len(self._touches) == 2:
+            (ax, ay), (bx, by) = previous.values()
+            old_distance = math.hypot(ax - bx, ay - by)
+            (ax, ay), (bx, by) = self._touches.values()
+            new_distance = math.hypot(ax - bx, ay - by)
+            if old_distance > 0 and new_distance > 0:
+                mid = min(1, max(0, ((ax + bx) / 2 - self.x - dp(40)) / chart_width))
+                return self.zoom(new_distance / old_distance, mid)
+        return False
+    
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return super().on_touch_down(touch)
+        touch.grab(self)
+        self.view_touch('down', touch.uid, touch.x, touch.y, touch)
+        return True
+    
+    def on_touch_move(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_move(touch)
+        self.view_touch('move', touch.uid, touch.x, touch.y, touch)
+        return True
+    
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_up(touch)
+        self.view_touch('up', touch.uid, touch.x, touch.y, touch)
+        touch.ungrab(self)
+        return True
+
+PIE_VERTEX_BUDGET = 128  # 饼图所有扇区的顶点总数，与扇区个数无关
+
+
+def pie_slice_meshes(counts, vertex_budget=PIE_VERTEX_BUDGET):
+    """单位圆上各扇区的三角扇顶点 [(vertices, indices) 或 None（计数为 0）]
+
+    从 0 度起逆时针排列。每个扇区的顶点为圆心加 边数+1 个圆周点，
+    边数按比例分配（每个扇区至少 1 条边，余数按最大小数部分分配），使顶点总数恰好为 vertex_budget。
+    """
+    total = sum(counts)
+    slices = [i for i, count in enumerate(counts) if count > 0]
+    if not total or not slices:
+        return [None] * len(counts)
+    
+    # 顶点总数 = 总边数 + 2 * 扇区数
+    spare = max(0, vertex_budget - 3 * len(slices))
+    shares = [spare * counts[i] / total for i in slices]
+    segments = [1 + int(share) for share in shares]
+    leftover = spare - sum(int(share) for share in shares)
+    by_fraction = sorted(range(len(slices)), key=lambda k: shares[k] - int(shares[k]), reverse=True)
+    for k in by_fraction[:leftover]:
+        segments[k] += 1
+    
+    meshes = [None] * len(counts)
+    start_angle = 0
+    for i, segment_count in zip(slices, segments):
+        angle = 2 * math.pi * counts[i] / total
+        vertices = [0, 0, 0, 0]
+        for seg in range(segment_count + 1):
+            rad = start_angle + angle * seg / segment_count
+            vertices.extend((math.cos(rad), math.sin(rad), 0, 0))
+        meshes[i] = (vertices, list(range(segment_count + 2)))
+        start_angle += angle
+    return meshes
+
 
 class SymptomChart(Widget):
-    """症状频率饼图"""
+    """症状频率饼图
+
+    扇区是单位圆上预先算好的实心三角扇 Mesh，放在 PushMatrix/Translate/Scale 之下，
+    尺寸变化时只改平移和缩放，顶点不变。
+    """
+    
+    # 颜色定义
+    COLORS = [
+        (0.93, 0.6, 0.73, 1),   # 粉色
+        (0.6, 0.8, 0.6, 1),     # 绿色
+        (0.8, 0.8, 0.4, 1),     # 黄色
+        (0.6, 0.7, 0.9, 1),     # 蓝色
+        (0.8, 0.6, 0.8, 1),     # 紫色
+        (0.9, 0.7, 0.5, 1),     # 橙色
+    ]
     
     def __init__(self, symptom_data, **kwargs):
         super().__init__(**kwargs)
-        self.symptom_data = symptom_data
         self.size_hint = (1, 1)
-        self.bind(pos=self.draw_chart, size=self.draw_chart)
+        # 一次布局中的多次 pos/size 事件只触发一次重绘
+        self.redraw = Clock.create_trigger(self.draw_chart)
+        self.bind(pos=self.redraw, size=self.redraw)
+        self.set_data(symptom_data)
     
-    def draw_chart(self, *args):
+    def set_data(self, symptom_data):
+        """换数据：生成单位圆上的扇区顶点和图例，重建绘图指令"""
+        self.symptom_data = dict(symptom_data or {})
         self.canvas.clear()
+        self.message = None
+        self.translate = None
+        self.legend = []
         
         if not self.symptom_data:
+            self.message = text_texture('暂无症状数据', sp(14))
             with self.canvas:
                 Color(0.7, 0.7, 0.7, 1)
-                Label(text='暂无症状数据', pos=self.pos, size=self.size)
+                self.message_rect = Rectangle(texture=self.message, size=self.message.size)
+            self.redraw()
             return
         
-        # 颜色定义
-        colors = [
-            (0.93, 0.6, 0.73, 1),   # 粉色
-            (0.6, 0.8, 0.6, 1),     # 绿色
-            (0.8, 0.8, 0.4, 1),     # 黄色
-            (0.6, 0.7, 0.9, 1),     # 蓝色
-            (0.8, 0.6, 0.8, 1),     # 紫色
-            (0.9, 0.7, 0.5, 1),     # 橙色
-        ]
-        
-        total = sum(self.symptom_data.values())
-        if total == 0:
+        counts = list(self.symptom_data.values())
+        if sum(counts) == 0:
             return
+        meshes = pie_slice_meshes(counts)
         
-        # 计算圆心和半径
-        center_x = self.center_x
-        center_y = self.center_y
-        radius = min(self.width, self.height) * 0.35
-        
-        # 绘制饼图
-        start_angle = 0
         with self.canvas:
+            # 饼图：单位圆坐标，由 Translate/Scale 放到圆心并缩放到半径
+            PushMatrix()
+            self.translate = Translate()
+            self.scale = Scale()
+            for i, mesh in enumerate(meshes):
+                if mesh is None:
+                    continue
+                vertices, indices = mesh
+                Color(*self.COLORS[i % len(self.COLORS)])
+                Mesh(vertices=vertices, indices=indices, mode='triangle_fan')
+            PopMatrix()
+            
+            # 图例（保持原来的行位置，计数为 0 的症状不显示）
             for i, (symptom, count) in enumerate(self.symptom_data.items()):
                 if count == 0:
                     continue
-                    
-                # 计算扇区角度
-                angle = 360 * (count / total)
-                
-                # 绘制扇区
-                color_idx = i % len(colors)
-                Color(*colors[color_idx])
-                
-                # 使用多个小线段模拟扇区
-                segment_count = int(angle * 2)
-                if segment_count < 1:
-                    continue
-                    
-                segment_angle = angle / segment_count
-                
-                points = [center_x, center_y]
-                for seg in range(segment_count + 1):
-                    current_angle = start_angle + (seg * segment_angle)
-                    rad = math.radians(current_angle)
-                    x = center_x + radius * math.cos(rad)
-                    y = center_y + radius * math.sin(rad)
-                    points.extend([x, y])
-                
-                # 闭合图形
-                points.extend([center_x, center_y])
-                
-                # 绘制多边形
-                Line(points=points, width=1, close=True)
-                
-                # 绘制图例
-                legend_x = self.x + dp(20)
-                legend_y = self.y + self.height - dp(30) - (i * dp(25))
-                
-                Color(*colors[color_idx])
-                Rectangle(pos=(legend_x, legend_y), size=(dp(15), dp(15)))
-                
+                Color(*self.COLORS[i % len(self.COLORS)])
+                swatch = Rectangle(size=(dp(15), dp(15)))
+                texture = text_texture(f"{symptom}: {count}次", sp(11))
                 Color(0.4, 0.2, 0.3, 1)
-                Label(text=f"{symptom}: {count}次", font_size=sp(11),
-                      pos=(legend_x + dp(20), legend_y-dp(3)), size=(dp(120), dp(20)))
-                
-                start_angle += angle
+                label = Rectangle(texture=texture, size=texture.size)
+                self.legend.append((i, swatch, label))
+        
+        self.redraw()
+    
+    def draw_chart(self, *args):
+        """按当前位置和尺寸移动饼图和图例"""
+        if self.message is not None:
+            self.message_rect.pos = (self.center_x - self.message.width / 2,
+                                     self.center_y - self.message.height / 2)
+            return
+        if self.translate is None:
+            return
+        
+        # 计算圆心和半径
+        radius = min(self.width, self.height) * 0.35
+        self.translate.xy = (self.center_x, self.center_y)
+        self.scale.xyz = (radius, radius, 1)
+        
+        for i, swatch, label in self.legend:
+            legend_x = self.x + dp(20)
+            legend_y = self.y + self.height - dp(30) - (i * dp(25))
+            swatch.pos = (legend_x, legend_y)
+            label.pos = (legend_x + dp(20), legend_y + dp(7.5) - label.size[1] / 2)
+
+
+class CycleDayHeatmap(Widget):
+    """症状/心情 × 周期日热力图
+
+    计数矩阵整体上传成一张纹理（每格一个像素，放大时保持边缘清晰），只用一个 Rectangle 显示；
+    左侧是各行的标签，下方每 7 天一个刻度。
+    """
+    
+    LABEL_WIDTH = 70   # 左侧标签列宽度（dp）
+    AXIS_HEIGHT = 20   # 下方刻度高度（dp）
+    
+    def __init__(self, analysis, **kwargs):
+        super().__init__(**kwargs)
+        self.size_hint = (1, 1)
+        self.redraw = Clock.create_trigger(self.draw_chart)
+        self.bind(pos=self.redraw, size=self.redraw)
+        
+        self.labels = analysis['labels']
+        self.row_labels = []
+        self.ticks = []
+        with self.canvas:
+            if not self.labels:
+                Color(0.7, 0.7, 0.7, 1)
+                self.message = text_texture('暂无数据', sp(14))
+                self.message_rect = Rectangle(texture=self.message, size=self.message.size)
+                return
+            self.message = None
+            
+            rows, days = analysis['days'].shape
+            self.columns = days
+            self.texture = Texture.create(size=(days, rows), colorfmt='rgba')
+            self.texture.mag_filter = 'nearest'
+            self.texture.min_filter = 'nearest'
+            self.texture.blit_buffer(heatmap_pixels(analysis['days']), colorfmt='rgba', bufferfmt='ubyte')
+            Color(1, 1, 1, 1)
+            self.rect = Rectangle(texture=self.texture)
+            
+            Color(0.4, 0.2, 0.3, 1)
+            for label in self.labels:
+                texture = text_texture(label, sp(11))
+                self.row_labels.append(Rectangle(texture=texture, size=texture.size))
+            for day in [1] + list(range(7, days + 1, 7)):
+                texture = text_texture(str(day), sp(10))
+                self.ticks.append((day, Rectangle(texture=texture, size=texture.size)))
+        self.redraw()
+    
+    def draw_chart(self, *args):
+        """按当前位置和尺寸移动热力图、标签和刻度"""
+        if self.message is not None:
+            self.message_rect.pos = (self.center_x - self.message.width / 2,
+                                     self.center_y - self.message.height / 2)
+            return
+        
+        left = self.x + dp(self.LABEL_WIDTH)
+        bottom = self.y + dp(self.AXIS_HEIGHT)
+        width = max(0, self.right - dp(5) - left)
+        height = max(0, self.top - bottom)
+        self.rect.pos = (left, bottom)
+        self.rect.size = (width, height)
+        
+        row_height = height / len(self.labels)
+        for i, rect in enumerate(self.row_labels):
+            center_y = self.top - (i + 0.5) * row_height
+            rect.pos = (self.x + dp(5), center_y - rect.size[1] / 2)
+        cell_width = width / self.columns
+        for day, rect in self.ticks:
+            center_x = left + (day - 0.5) * cell_width
+            rect.pos = (center_x - rect.size[0] / 2, self.y + dp(3))
+
+# ============================================
+# 图表离屏纹理缓存
+# ============================================
+
+CHART_CACHE_SIZE = 8  # 最多缓存的图表纹理个数
+
+
+class ChartTextureCache:
+    """图表离屏渲染结果的 LRU 缓存，键为 (数据版本, 图表种类, 宽, 高, DPI)
+
+    每项保存 Fbo 和画在其中的图表控件：Fbo 持有纹理，GL 上下文重建（如 Android 切回前台）时
+    Fbo 会用图表的绘图指令自动重画。
+    """
+    
+    def __init__(self, max_entries=CHART_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+    
+    def get(self, key, factory):
+        """返回 key 对应的纹理，没有时调用 factory() 创建图表并离屏渲染"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0].texture
+        
+        self.misses += 1
+        width, height = key[2], key[3]
+        chart = factory()
+        chart.size_hint = (None, None)
+        chart.pos = (0, 0)
+        chart.size = (width, height)
+        chart.draw_chart()
+        
+        fbo = Fbo(size=(width, height))
+        with fbo:
+            ClearColor(0, 0, 0, 0)
+            ClearBuffers()
+        fbo.add(chart.canvas)
+        fbo.draw()
+        
+        self._entries[key] = (fbo, chart)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return fbo.texture
+    
+    def lookup(self, key):
+        """返回 key 对应的 (Fbo, 图表控件)，不在缓存中时返回 None"""
+        return self._entries.get(key)
+    
+    def clear(self):
+        self._entries.clear()
+
+
+class CachedChart(Widget):
+    """显示缓存的图表纹理：尺寸变化时按新键取纹理，键不变时只移动矩形
+
+    图表支持 view_touch()（如 CycleChart 的缩放平移）时，触摸换算到图表坐标后转交给它，
+    视窗变化时在原来的 Fbo 里重画一次。
+    """
+    
+    def __init__(self, cache, kind, version, factory, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.kind = kind
+        self.version = version
+        self.factory = factory
+        self.key = None
+        with self.canvas:
+            Color(1, 1, 1, 1)
+            self.rect = Rectangle(pos=self.pos, size=self.size)
+        self.refresh = Clock.create_trigger(self.update_texture)
+        self.bind(pos=self.refresh, size=self.refresh)
+    
+    def update_texture(self, *args):
+        width, height = int(self.width), int(self.height)
+        if width <= 0 or height <= 0:
+            return
+        self.key = (self.version, self.kind, width, height, Metrics.dpi)
+        self.rect.texture = self.cache.get(self.key, self.factory)
+        self.rect.pos = self.pos
+        self.rect.size = (width, height)
+    
+    def forward_touch(self, phase, touch):
+        """把触摸转交给缓存中的图表，视窗变化时重画 Fbo"""
+        entry = self.cache.lookup(self.key) if self.key is not None else None
+        if entry is None:
+            return
+        fbo, chart = entry
+        # 缓存中的图表位于 (0, 0)，本控件内的相对坐标就是图表坐标
+        if chart.view_touch(phase, touch.uid, touch.x - self.x, touch.y - self.y, touch):
+            chart.draw_chart()
+            fbo.draw()
+            self.rect.texture = fbo.texture
+            self.canvas.ask_update()
+    
+    def on_touch_down(self, touch):
+        entry = self.cache.lookup(self.key) if self.key is not None else None
+        if entry is None or not hasattr(entry[1], 'view_touch') or not self.collide_point(*touch.pos):
+            return super().on_touch_down(touch)
+        touch.grab(self)
+        self.forward_touch('down', touch)
+        return True
+    
+    def on_touch_move(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_move(touch)
+        self.forward_touch('move', touch)
+        return True
+    
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_up(touch)
+        self.forward_touch('up', touch)
+        touch.ungrab(self)
+        return True
 
 # ============================================
 # 优化的日历视图
 # ============================================
 
 class CalendarDayButton(Button):
-    """日历日期按钮"""
+    """日历日期按钮（网格初始化时创建 42 个，之后只用 rebind() 更新内容）
+
+    记录指示点不由按钮自己绘制，而是由所在的 CalendarGrid 统一绘制。
+    """
+    
+    EMPTY_COLOR = (0.9, 0.9, 0.9, 0.5)
+    DAY_COLOR = (0.95, 0.95, 0.95, 1)
     
-    def __init__(self, date, has_period=False, has_mood=False, has_intimacy=False, **kwargs):
+    def __init__(self, date=None, has_period=False, has_mood=False, has_intimacy=False, **kwargs):
         super().__init__(**kwargs)
-        self.date = date
-        self.has_period = has_period
-        self.has_mood = has_mood
-        self.has_intimacy = has_intimacy
         self.background_normal = ''
-        self.background_color = (0.95, 0.95, 0.95, 1) if date else (0.9, 0.9, 0.9, 0.5)
         self.color = (0.3, 0.2, 0.25, 1)
         self.font_size = sp(14)
         self.font_name = 'simhei'
         self.bold = True
-        
-        # 如果有记录，添加指示器
-        self.indicators = []
-        self.create_indicators()
+        self.rebind(date, str(date.day) if date else '', has_period, has_mood, has_intimacy)
+    
+    def rebind(self, date, text, has_period=False, has_mood=False, has_intimacy=False,
+               background_color=None):
+        """换成另一天的内容（date 为 None 表示占位格），不新建控件和绘图指令"""
+        self.date = date
+        self.text = text
+        self.has_period = has_period
+        self.has_mood = has_mood
+        self.has_intimacy = has_intimacy
+        if background_color is None:
+            background_color = self.DAY_COLOR if date else self.EMPTY_COLOR
+        self.background_color = background_color
+
+
+class CalendarGrid(GridLayout):
+    """日历网格：所有日期格的记录指示点画在网格自己的一组指令里
+
+    每种记录（经期/心情/爱爱）一个 Color + Mesh，整个月共 6 条指令；
+    标记或布局变化时原地替换 Mesh 的顶点，而不是每格各自增删 Ellipse。
+    """
+    
+    INDICATOR_COLORS = (
+        (0.93, 0.6, 0.73),  # 粉色：经期
+        (0.8, 0.8, 0.4),    # 黄色：心情
+        (0.6, 0.8, 0.6),    # 绿色：爱爱
+    )
+    INDICATOR_SEGMENTS = 12  # 每个圆点的边数
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        angles = [2 * math.pi * i / self.INDICATOR_SEGMENTS for i in range(self.INDICATOR_SEGMENTS)]
+        self._unit_circle = [(math.cos(a), math.sin(a)) for a in angles]
+        
+        self.indicator_group = InstructionGroup()
+        self.indicator_meshes = []
+        for rgb in self.INDICATOR_COLORS:
+            self.indicator_group.add(Color(*rgb, 1))
+            mesh = Mesh(mode='triangles')
+            self.indicator_group.add(mesh)
+            self.indicator_meshes.append(mesh)
+        self.canvas.after.add(self.indicator_group)
+        
+        # 同一帧内的多次变化（网格和各格的 pos/size、内容刷新）只重算一次
+        self.refresh_indicators = Clock.create_trigger(self.update_indicators)
+        self.bind(pos=self.refresh_indicators, size=self.refresh_indicators)
+    
+    def add_widget(self, widget, *args, **kwargs):
+        widget.bind(pos=self.refresh_indicators, size=self.refresh_indicators)
+        super().add_widget(widget, *args, **kwargs)
+        self.refresh_indicators()
     
-    def create_indicators(self):
-        """创建记录指示器"""
+    def remove_widget(self, widget, *args, **kwargs):
+        widget.unbind(pos=self.refresh_indicators, size=self.refresh_indicators)
+        super().remove_widget(widget, *args, **kwargs)
+        self.refresh_indicators()
+    
+    def update_indicators(self, *args):
+        """按各日期格当前的标记和位置重建三个 Mesh 的顶点"""
         indicator_size = dp(6)
         spacing = dp(2)
-        
-        if self.has_period:
-            with self.canvas.after:
-                Color(0.93, 0.6, 0.73, 1)  # 粉色
-                self.indicators.append(
-                    Ellipse(pos=(self.center_x - indicator_size/2, self.y + spacing),
-                           size=(indicator_size, indicator_size))
-                )
-        
-        if self.has_mood:
-            with self.canvas.after:
-                Color(0.8, 0.8, 0.4, 1)  # 黄色
-                x_offset = len(self.indicators) * (indicator_size + spacing)
-                self.indicators.append(
-                    Ellipse(pos=(self.center_x - indicator_size/2 + x_offset, self.y + spacing),
-                           size=(indicator_size, indicator_size))
-                )
-        
-        if self.has_intimacy:
-            with self.canvas.after:
-                Color(0.6, 0.8, 0.6, 1)  # 绿色
-                x_offset = len(self.indicators) * (indicator_size + spacing)
-                self.indicators.append(
-                    Ellipse(pos=(self.center_x - indicator_size/2 + x_offset, self.y + spacing),
-                           size=(indicator_size, indicator_size))
-                )
+        radius = indicator_size / 2
+        segments = self.INDICATOR_SEGMENTS
+        vertices = [[], [], []]
+        indices = [[], [], []]
+        
+        for cell in self.children:
+            flags = (getattr(cell, 'has_period', False), getattr(cell, 'has_mood', False),
+                     getattr(cell, 'has_intimacy', False))
+            # 同一格内的点从中间开始依次向右排列
+            slot = 0
+            for kind, shown in enumerate(flags):
+                if not shown:
+                    continue
+                cx = cell.center_x + slot * (indicator_size + spacing)
+                cy = cell.y + spacing + radius
+                kind_vertices = vertices[kind]
+                base = len(kind_vertices) // 4
+                kind_vertices.extend((cx, cy, 0, 0))
+                for dx, dy in self._unit_circle:
+                    kind_vertices.extend((cx + dx * radius, cy + dy * radius, 0, 0))
+                kind_indices = indices[kind]
+                for i in range(segments):
+                    kind_indices.extend((base, base + 1 + i, base + 1 + (i + 1) % segments))
+                slot += 1
+        
+        for mesh, kind_vertices, kind_indices in zip(self.indicator_meshes, vertices, indices):
+            mesh.vertices = kind_vertices
+            mesh.indices = kind_indices
+
+# ============================================
+# 月份模型
+# ============================================
+
+MONTH_CACHE_SIZE = 6  # 缓存的月份模型个数（当前月及前后预取的月份）
+
+
+def shift_month(year, month, delta):
+    """返回 (year, month) 之后第 delta 个月"""
+    index = year * 12 + month - 1 + delta
+    return index // 12, index % 12 + 1
+
+
+def build_month_model(year, month, record_masks, forecast_masks, today):
+    """计算一个月 42 格的显示内容，不涉及控件
+
+    record_masks 为 RecordStore.month_flags 的三个位图，forecast_masks 为预测叠加层的三个位图。
+    返回 42 个 (date, 文本, 经期, 心情, 爱爱, 底色) 元组，可直接传给 CalendarDayButton.rebind。
+    """
+    period_mask, mood_mask, intimacy_mask = record_masks
+    predicted_mask, ovulation_mask, fertile_mask = forecast_masks
+    
+    # 获取月份信息 (monthrange 返回的星期中 0=周一)
+    first_weekday, days_in_month = py_calendar.monthrange(year, month)
+    # 计算第一天是星期几 (0=周日, 6=周六)
+    start_weekday = (first_weekday + 1) % 7
     
-    def on_size(self, *args):
-        """当大小改变时更新指示器位置"""
-        for indicator in self.indicators:
-            indicator.pos = (self.center_x - dp(3), self.y + dp(2))
+    cells = []
+    for index in range(42):
+        day = index - start_weekday + 1
+        
+        # 上个月和下个月的占位格
+        if not 1 <= day <= days_in_month:
+            cells.append((None, '', False, False, False, None))
+            continue
+        
+        date = datetime(year, month, day)
+        bit = 1 << (day - 1)
+        
+        # 预测日底色（已有经期记录的日期不再标记预测经期）
+        background_color = None
+        if predicted_mask & bit and not period_mask & bit:
+            background_color = (0.98, 0.88, 0.92, 1)
+        elif ovulation_mask & bit:
+            background_color = (0.82, 0.92, 0.8, 1)
+        elif fertile_mask & bit:
+            background_color = (0.91, 0.96, 0.89, 1)
+        
+        # 如果是今天，特殊标记
+        if date.date() == today:
+            background_color = (0.93, 0.8, 0.85, 1)
+        
+        cells.append((date, str(day), bool(period_mask & bit), bool(mood_mask & bit),
+                      bool(intimacy_mask & bit), background_color))
+    return tuple(cells)
 
 # ============================================
 # 主日历屏幕
@@ -572,7 +922,7 @@ class MainCalendarScreen(Screen):
         
         today_btn = Button(
             text='今天',
-            size_hint=(0.5, 1),
+            size_hint=(0.4, 1),
             background_color=(0.93, 0.8, 0.85, 1),
             color=(0.93, 0.6, 0.73, 1),
             font_name='simhei'
@@ -589,7 +939,17 @@ class MainCalendarScreen(Screen):
         )
         add_btn.bind(on_press=self.show_add_menu)
         
+        year_btn = Button(
+            text='年',
+            size_hint=(0.3, 1),
+            background_color=(0.95, 0.95, 0.95, 1),
+            color=(0.93, 0.6, 0.73, 1),
+            font_name='simhei'
+        )
+        year_btn.bind(on_press=lambda x: setattr(self.manager, 'current', 'year_view'))
+        
         right_header.add_widget(today_btn)
+        right_header.add_widget(year_btn)
         right_header.add_widget(add_btn)
         
         header.add_widget(left_header)
@@ -644,7 +1004,20 @@ class MainCalendarScreen(Screen):
             weekdays_layout.add_widget(day_label)
         
         # 日历网格
-        self.calendar_grid = GridLayout(cols=7, spacing=dp(2), size_hint_y=0.6)
+        self.calendar_grid = CalendarGrid(cols=7, spacing=dp(2), size_hint_y=0.6)
+        
+        # 月份模型缓存（LRU）和空闲时待预取的月份
+        self.month_models = OrderedDict()
+        self.month_models_version = None
+        self.prefetch_queue = []
+        
+        # 6x7 个日期格只创建一次，翻月和保存后由 update_calendar 重新绑定内容
+        self.day_cells = []
+        for _ in range(42):
+            cell = CalendarDayButton()
+            cell.bind(on_press=self.on_cell_press)
+            self.calendar_grid.add_widget(cell)
+            self.day_cells.append(cell)
         
         # 底部功能区
         bottom_layout = BoxLayout(orientation='vertical', size_hint_y=0.12, 
@@ -698,10 +1071,7 @@ class MainCalendarScreen(Screen):
         self.update_status()
     
     def update_calendar(self):
-        """更新日历显示"""
-        # 清空日历网格
-        self.calendar_grid.clear_widgets()
-        
+        """更新日历显示（月份内容来自缓存的月份模型，这里只套用到 42 个日期格）"""
         year = self.current_date.year
         month = self.current_date.month
         
@@ -709,84 +1079,55 @@ class MainCalendarScreen(Screen):
         self.month_label.text = f'{year}年{month}月'
         self.year_month_label.text = f'{year}年{month}月'
         
-        # 获取月份信息
-        first_day = datetime(year, month, 1)
-        last_day = datetime(year, month + 1, 1) - timedelta(days=1) if month < 12 else datetime(year + 1, 1, 1) - timedelta(days=1)
-        
-        # 获取记录
-        app = App.get_running_app()
-        records = app.load_records()
+        for cell, content in zip(self.day_cells, self.get_month_model(year, month)):
+            cell.rebind(*content)
         
-        # 计算第一天是星期几 (0=周日, 6=周六)
-        start_weekday = first_day.weekday()
-        if start_weekday == 6:  # 如果第一天是周六，则从周日开始
-            start_weekday = 0
-        else:
-            start_weekday += 1
-        
-        # 添加上个月的占位日期
-        prev_month_last_day = datetime(year, month, 1) - timedelta(days=1)
-        for i in range(start_weekday):
-            day = prev_month_last_day.day - (start_weekday - i - 1)
-            date = datetime(year, month - 1, day) if month > 1 else datetime(year - 1, 12, day)
-            btn = CalendarDayButton(date=None)
-            btn.text = ''
-            self.calendar_grid.add_widget(btn)
-        
-        # 添加当前月的日期
-        for day in range(1, last_day.day + 1):
-            date = datetime(year, month, day)
-            date_str = date.strftime('%Y-%m-%d')
-            
-            # 检查该日期的记录
-            has_period = False
-            has_mood = False
-            has_intimacy = False
-            
-            for record in records:
-                if record.get('type') == 'period':
-                    start_date = record.get('start_date')
-                    end_date = record.get('end_date') or start_date
-                    if start_date and end_date:
-                        try:
-                            start = datetime.strptime(start_date, '%Y-%m-%d')
-                            end = datetime.strptime(end_date, '%Y-%m-%d')
-                            if start <= date <= end:
-                                has_period = True
-                        except:
-                            pass
-                
-                elif record.get('type') == 'mood_symptom' and record.get('date') == date_str:
-                    has_mood = True
-                
-                elif record.get('type') == 'intimacy' and record.get('date') == date_str:
-                    has_intimacy = True
-            
-            # 创建日期按钮
-            btn = CalendarDayButton(
-                date=date,
-                has_period=has_period,
-                has_mood=has_mood,
-                has_intimacy=has_intimacy
-            )
-            btn.text = str(day)
-            
-            # 如果是今天，特殊标记
-            today = datetime.now()
-            if date.year == today.year and date.month == today.month and date.day == today.day:
-                btn.background_color = (0.93, 0.8, 0.85, 1)
-            
-            # 绑定点击事件
-            btn.bind(on_press=lambda instance, d=date: self.on_date_click(d))
-            
-            self.calendar_grid.add_widget(btn)
+        # 指示点由网格统一重绘（下一帧，一次完成）
+        self.calendar_grid.refresh_indicators()
         
-        # 添加下个月的占位日期
-        remaining_days = 42 - (start_weekday + last_day.day)  # 6x7网格
-        for i in range(remaining_days):
-            btn = CalendarDayButton(date=None)
-            btn.text = ''
-            self.calendar_grid.add_widget(btn)
+        # 空闲帧里依次准备上个月和下个月，翻月时直接套用
+        self.prefetch_queue = [shift_month(year, month, -1), shift_month(year, month, 1)]
+        Clock.schedule_once(self.prefetch_step, 0)
+    
+    def get_month_model(self, year, month):
+        """取某月的月份模型，按 (数据版本, 今天, 年, 月) 缓存最近 MONTH_CACHE_SIZE 个月"""
+        app = App.get_running_app()
+        version = app.refresh_version()
+        if version != self.month_models_version:
+            self.month_models.clear()
+            self.month_models_version = version
+        
+        today = datetime.now().date()
+        key = (today, year, month)
+        model = self.month_models.get(key)
+        if model is not None:
+            self.month_models.move_to_end(key)
+            return model
+        
+        # 本月每天的记录标记与预测标记（都是按数据版本缓存的位图）
+        model = build_month_model(year, month, app.store.month_flags(year, month),
+                                  app.get_forecast_overlay().get(year, month), today)
+        self.month_models[key] = model
+        while len(self.month_models) > MONTH_CACHE_SIZE:
+            self.month_models.popitem(last=False)
+        return model
+    
+    def prefetch_step(self, dt):
+        """每帧预取一个月，直到队列为空"""
+        if not self.prefetch_queue:
+            return
+        year, month = self.prefetch_queue.pop(0)
+        try:
+            self.get_month_model(year, month)
+        except Exception as e:
+            print(f"预取月份时出错: {e}")
+        if self.prefetch_queue:
+            Clock.schedule_once(self.prefetch_step, 0)
+    
+    def on_cell_press(self, cell):
+        """日期格点击事件（占位格不响应）"""
+        if cell.date is not None:
+            self.on_date_click(cell.date)
     
     def on_date_click(self, date):
         """日期点击事件"""
@@ -812,7 +1153,7 @@ class MainCalendarScreen(Screen):
             records_layout = BoxLayout(orientation='vertical', spacing=dp(8))
             
             for record in records:
-                if record.get('type') == 'period':
+                if isinstance(record, PeriodRecord):
                     record_text = f"📅 经期记录"
                     records_layout.add_widget(Label(
                         text=record_text,
@@ -821,9 +1162,9 @@ class MainCalendarScreen(Screen):
                         font_name='simhei'
                     ))
                 
-                elif record.get('type') == 'mood_symptom':
-                    mood = record.get('mood', '未知')
-                    symptoms = record.get('symptoms', [])
+                elif isinstance(record, MoodSymptomRecord):
+                    mood = record.mood or '未知'
+                    symptoms = record.symptoms
                     symptoms_text = ', '.join(symptoms) if symptoms else '无'
                     record_text = f"😊 {mood}\n症状: {symptoms_text}"
                     records_layout.add_widget(Label(
@@ -833,9 +1174,9 @@ class MainCalendarScreen(Screen):
                         font_name='simhei'
                     ))
                 
-                elif record.get('type') == 'intimacy':
-                    intimacy_type = record.get('intimacy_type', '未知')
-                    note = record.get('note', '')
+                elif isinstance(record, IntimacyRecord):
+                    intimacy_type = record.intimacy_type or '未知'
+                    note = record.note
                     record_text = f"💖 {intimacy_type}"
                     if note:
                         record_text += f"\n备注: {note}"
@@ -1212,8 +1553,7 @@ class MainCalendarScreen(Screen):
         
         # 安全期提醒
         app = App.get_running_app()
-        predictor = CyclePredictor(app.load_records())
-        next_period_start, _, ovulation_date, fertile_window = predictor.predict_next_period()
+        next_period_start, _, ovulation_date, fertile_window = app.get_prediction()
         
         reminder_text = ''
         if ovulation_date:
@@ -1334,16 +1674,24 @@ class MainCalendarScreen(Screen):
             return
         
         # 使用智能预测
-        predictor = CyclePredictor(records)
-        next_period_start, next_period_end, ovulation_date, fertile_window = predictor.predict_next_period()
+        next_period_start, next_period_end, ovulation_date, fertile_window = app.get_prediction()
         
         today = datetime.now()
         
         if next_period_start:
             days_to_next = (next_period_start - today).days
             
+            # 80% 预测区间的半宽，显示为 ±N天
+            interval = app.get_prediction_interval()
+            spread = ''
+            if interval and 0.8 in interval:
+                low, high = interval[0.8]
+                half_width = round((high - low).days / 2)
+                if half_width > 0:
+                    spread = f" ±{half_width}天"
+            
             if days_to_next > 0:
-                status_text = f"📅 下次经期: {next_period_start.strftime('%m月%d日')} ({days_to_next}天后)"
+                status_text = f"📅 下次经期: {next_period_start.strftime('%m月%d日')}{spread} ({days_to_next}天后)"
             elif days_to_next == 0:
                 status_text = "📅 经期今天开始"
             else:
@@ -1447,8 +1795,7 @@ class MainCalendarScreen(Screen):
             app.show_popup('统计', '暂无数据')
             return
         
-        predictor = CyclePredictor(records)
-        stats = predictor.get_cycle_statistics()
+        stats = app.get_cycle_statistics()
         
         if not stats:
             app.show_popup('统计', '需要至少两次经期记录')
@@ -1474,6 +1821,9 @@ class MainCalendarScreen(Screen):
         周期次数: {stats['cycle_count']} 次
         规律性: {100 - stats['irregularity']:.1f}%
         """
+        if DEBUG:
+            cache_stats = app.prediction_cache.stats()
+            stats_text += f"预测缓存命中率: {cache_stats['hit_rate']:.0%} ({cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']})\n"
         
         stats_label = Label(
             text=stats_text,
@@ -1507,10 +1857,7 @@ class MainCalendarScreen(Screen):
     def show_reminders(self):
         """显示提醒"""
         app = App.get_running_app()
-        records = app.load_records()
-        predictor = CyclePredictor(records)
-        
-        next_period_start, next_period_end, ovulation_date, fertile_window = predictor.predict_next_period()
+        next_period_start, next_period_end, ovulation_date, fertile_window = app.get_prediction()
         
         content = BoxLayout(orientation='vertical', spacing=dp(10), padding=dp(20))
         
@@ -1635,11 +1982,23 @@ class ChartsScreen(Screen):
         layout.add_widget(header)
         layout.add_widget(scroll)
         
-        # 更新图表内容
-        Clock.schedule_once(lambda dt: self.update_charts(content), 0.1)
-        
         scroll.add_widget(content)
         self.add_widget(layout)
+        
+        # 图表内容在进入屏幕时按数据版本更新，图表本身渲染成纹理缓存
+        self.content = content
+        self.charts_version = None
+        self.chart_textures = ChartTextureCache()
+        self.symptom_window = None  # 症状统计的时间范围（月数），None 为全部
+        self.symptom_container = None
+        self.cycle_day_kind = 'symptoms'  # 周期日热力图显示症状还是心情
+        self.cycle_day_container = None
+    
+    def on_enter(self):
+        """进入屏幕时，只有数据变化过才重建内容；图表纹理命中缓存时不重新绘制"""
+        app = App.get_running_app()
+        if self.charts_version != app.refresh_version():
+            self.update_charts(self.content)
     
     def update_charts(self, content):
         """更新图表内容"""
@@ -1647,6 +2006,8 @@ class ChartsScreen(Screen):
         
         app = App.get_running_app()
         records = app.load_records()
+        version = app.store.version
+        self.charts_version = version
         
         if not records:
             no_data_label = Label(
@@ -1659,8 +2020,7 @@ class ChartsScreen(Screen):
             content.add_widget(no_data_label)
             return
         
-        predictor = CyclePredictor(records)
-        stats = predictor.get_cycle_statistics()
+        stats = app.get_cycle_statistics()
         
         if stats and len(stats.get('cycle_lengths', [])) >= 2:
             # 周期长度折线图
@@ -1676,13 +2036,14 @@ class ChartsScreen(Screen):
             content.add_widget(cycle_chart_title)
             
             chart_container = BoxLayout(size_hint_y=None, height=dp(200))
-            chart = CycleChart(stats['cycle_lengths'])
+            cycle_lengths = stats['cycle_lengths']
+            chart = CachedChart(self.chart_textures, 'cycle', version,
+                                lambda: CycleChart(cycle_lengths))
             chart_container.add_widget(chart)
             content.add_widget(chart_container)
         
-        # 症状频率统计
-        symptom_data = self.analyze_symptoms(records)
-        if symptom_data:
+        # 症状频率统计（有过症状记录才显示，时间范围可切换）
+        if self.analyze_symptoms():
             symptom_title = Label(
                 text='症状频率分析',
                 font_size=sp(18),
@@ -1694,10 +2055,59 @@ class ChartsScreen(Screen):
             )
             content.add_widget(symptom_title)
             
-            symptom_container = BoxLayout(size_hint_y=None, height=dp(250))
-            chart = SymptomChart(symptom_data)
-            symptom_container.add_widget(chart)
-            content.add_widget(symptom_container)
+            window_layout = BoxLayout(orientation='horizontal', size_hint_y=None,
+                                      height=dp(35), spacing=dp(5))
+            for text, months in (('全部', None), ('3个月', 3), ('6个月', 6), ('12个月', 12)):
+                btn = ToggleButton(
+                    text=text,
+                    group='symptom_window',
+                    size_hint=(0.25, 1),
+                    background_color=(0.95, 0.95, 0.95, 1),
+                    font_name='simhei'
+                )
+                if months == self.symptom_window:
+                    btn.state = 'down'
+                btn.bind(on_press=lambda instance, m=months: self.select_symptom_window(m))
+                window_layout.add_widget(btn)
+            content.add_widget(window_layout)
+            
+            self.symptom_container = BoxLayout(size_hint_y=None, height=dp(250))
+            self.update_symptom_chart()
+            content.add_widget(self.symptom_container)
+        
+        # 症状/心情按周期日的分布（至少有两次经期才能对齐周期）
+        if stats:
+            cycle_day_title = Label(
+                text='周期日分布',
+                font_size=sp(18),
+                bold=True,
+                color=(0.8, 0.6, 0.8, 1),
+                size_hint_y=None,
+                height=dp(30),
+                font_name='simhei'
+            )
+            content.add_widget(cycle_day_title)
+            
+            kind_layout = BoxLayout(orientation='horizontal', size_hint_y=None,
+                                    height=dp(35), spacing=dp(5))
+            for text, kind in (('症状', 'symptoms'), ('心情', 'moods')):
+                btn = ToggleButton(
+                    text=text,
+                    group='cycle_day_kind',
+                    size_hint=(0.5, 1),
+                    background_color=(0.95, 0.95, 0.95, 1),
+                    font_name='simhei'
+                )
+                if kind == self.cycle_day_kind:
+                    btn.state = 'down'
+                btn.bind(on_press=lambda instance, k=kind: self.select_cycle_day_kind(k))
+                kind_layout.add_widget(btn)
+            content.add_widget(kind_layout)
+            
+            self.cycle_day_container = BoxLayout(orientation='vertical', size_hint_y=None,
+                                                 spacing=dp(5))
+            self.update_cycle_day_chart()
+            content.add_widget(self.cycle_day_container)
         
         # 添加预测信息
         if stats:
@@ -1712,7 +2122,7 @@ class ChartsScreen(Screen):
             )
             content.add_widget(prediction_title)
             
-            next_period_start, next_period_end, ovulation_date, fertile_window = predictor.predict_next_period()
+            next_period_start, next_period_end, ovulation_date, fertile_window = app.get_prediction()
             
             if next_period_start:
                 today = datetime.now()
@@ -1739,23 +2149,57 @@ class ChartsScreen(Screen):
         # 设置最小高度
         content.height = len(content.children) * dp(100)
     
-    def analyze_symptoms(self, records):
-        """分析症状频率"""
-        symptom_count = defaultdict(int)
-        
-        for record in records:
-            if record.get('type') == 'mood_symptom':
-                symptoms = record.get('symptoms', [])
-                for symptom in symptoms:
-                    # 清理症状文本
-                    clean_symptom = symptom.replace('其他: ', '').strip()
-                    if clean_symptom:
-                        symptom_count[clean_symptom] += 1
-        
-        # 只保留频率最高的5个症状
-        sorted_symptoms = sorted(symptom_count.items(), key=lambda x: x[1], reverse=True)[:5]
-        
-        return dict(sorted_symptoms)
+    def analyze_symptoms(self, months=None):
+        """频率最高的 5 个症状（由记录层的症状索引提供），months 为最近几个月，None 为全部"""
+        app = App.get_running_app()
+        return app.store.top_symptoms(5, months)
+    
+    def select_symptom_window(self, months):
+        """切换症状统计的时间范围，只替换饼图"""
+        self.symptom_window = months
+        self.update_symptom_chart()
+    
+    def update_symptom_chart(self):
+        app = App.get_running_app()
+        symptom_data = self.analyze_symptoms(self.symptom_window)
+        # 按月统计的结果随日期变化，键中带上今天
+        kind = 'symptom' if self.symptom_window is None else \
+            f'symptom:{self.symptom_window}:{datetime.now().date()}'
+        self.symptom_container.clear_widgets()
+        self.symptom_container.add_widget(
+            CachedChart(self.chart_textures, kind, app.store.version,
+                        lambda: SymptomChart(symptom_data)))
+
+    
+    def select_cycle_day_kind(self, kind):
+        """切换周期日热力图显示症状还是心情"""
+        self.cycle_day_kind = kind
+        self.update_cycle_day_chart()
+    
+    def update_cycle_day_chart(self):
+        app = App.get_running_app()
+        analysis = app.get_cycle_day_analysis()[self.cycle_day_kind]
+        rows = max(1, len(analysis['labels']))
+        summary = '\n'.join(f"{label}: 多在{phase}（{share:.0%}）"
+                            for label, phase, share in phase_summary(analysis))
+        
+        self.cycle_day_container.clear_widgets()
+        chart_container = BoxLayout(size_hint_y=None,
+                                    height=dp(CycleDayHeatmap.AXIS_HEIGHT) + rows * dp(22))
+        chart_container.add_widget(
+            CachedChart(self.chart_textures, f'cycle_days:{self.cycle_day_kind}', app.store.version,
+                        lambda: CycleDayHeatmap(analysis)))
+        self.cycle_day_container.add_widget(chart_container)
+        summary_label = Label(
+            text=summary,
+            font_size=sp(13),
+            color=(0.4, 0.2, 0.3, 1),
+            size_hint_y=None,
+            height=rows * dp(20),
+            font_name='simhei'
+        )
+        self.cycle_day_container.add_widget(summary_label)
+        self.cycle_day_container.height = chart_container.height + summary_label.height + dp(5)
 
 # ============================================
 # 其他屏幕（设置、历史记录）
@@ -2022,18 +2466,17 @@ class HistoryScreen(Screen):
             self.history_layout.add_widget(no_record_label)
             return
         
+        # 根据筛选条件过滤（按类型的索引查询）
+        filter_types = {'经期': 'period', '心情': 'mood_symptom', '爱爱': 'intimacy'}
+        if self.active_filter in filter_types:
+            records = app.store.records_of_type(filter_types[self.active_filter])
+        
         # 按日期分组
         records_by_date = defaultdict(list)
         for record in records:
-            # 根据筛选条件过滤
-            if self.active_filter == '全部' or \
-               (self.active_filter == '经期' and record.get('type') == 'period') or \
-               (self.active_filter == '心情' and record.get('type') == 'mood_symptom') or \
-               (self.active_filter == '爱爱' and record.get('type') == 'intimacy'):
-                
-                date_key = record.get('date') or record.get('start_date')
-                if date_key:
-                    records_by_date[date_key].append(record)
+            date_key = record.date_key
+            if date_key:
+                records_by_date[date_key].append(record)
         
         # 按日期排序（最近的在前）
         sorted_dates = sorted(records_by_date.keys(), reverse=True)
@@ -2054,11 +2497,9 @@ class HistoryScreen(Screen):
             
             # 该日期的所有记录
             for record in records_by_date[date_key]:
-                record_type = record.get('type', '')
-                
-                if record_type == 'period':
-                    start = record.get('start_date', '')
-                    end = record.get('end_date', '')
+                if isinstance(record, PeriodRecord):
+                    start = record.start_date
+                    end = record.end_date
                     
                     if start == end:
                         text = f"  经期: {start}"
@@ -2069,9 +2510,9 @@ class HistoryScreen(Screen):
                     
                     icon = '🩸'
                 
-                elif record_type == 'mood_symptom':
-                    mood = record.get('mood', '未知')
-                    symptoms = record.get('symptoms', [])
+                elif isinstance(record, MoodSymptomRecord):
+                    mood = record.mood or '未知'
+                    symptoms = record.symptoms
                     symptoms_text = ', '.join(symptoms[:3]) if symptoms else '无'
                     if len(symptoms) > 3:
                         symptoms_text += '...'
@@ -2083,9 +2524,9 @@ class HistoryScreen(Screen):
                     color = (0.8, 0.8, 0.4, 1)
                     icon = '😊'
                 
-                elif record_type == 'intimacy':
-                    intimacy_type = record.get('intimacy_type', '未知')
-                    note = record.get('note', '')
+                elif isinstance(record, IntimacyRecord):
+                    intimacy_type = record.intimacy_type or '未知'
+                    note = record.note
                     note_text = f" ({note})" if note else ''
                     text = f"  爱爱: {intimacy_type}{note_text}"
                     color = (0.6, 0.8, 0.6, 1)
@@ -2105,6 +2546,231 @@ class HistoryScreen(Screen):
                 )
                 self.history_layout.add_widget(record_label)
 
+# ============================================
+# 全年概览屏幕
+# ============================================
+
+YEAR_CELL_PIXELS = 5  # 热力图每天占 5x5 像素：4x4 的色块加 1 像素间隔
+
+YEAR_COLORS = {
+    'gap': (255, 255, 255, 0),
+    'day': (242, 242, 242, 255),
+    'period': (237, 153, 186, 255),
+    'predicted': (250, 224, 235, 255),
+    'ovulation': (209, 235, 204, 255),
+    'fertile': (232, 245, 227, 255),
+    'today': (237, 204, 217, 255),
+    'mood': (204, 204, 102, 255),
+    'intimacy': (153, 204, 153, 255),
+}
+
+
+def build_year_pixels(year, record_masks, forecast_masks, today):
+    """把一年的每日标记画成 RGBA 像素（31 列 x 12 行，1 月在最上面），不涉及控件
+
+    record_masks/forecast_masks 为 12 个月各自的三个位图，与 update_calendar 用的相同。
+    色块底色表示经期/预测经期/排卵日/易孕期，左下和右下 2x2 像素表示心情和爱爱记录。
+    """
+    cell = YEAR_CELL_PIXELS
+    width = 31 * cell
+    colors = {name: bytes(rgba) for name, rgba in YEAR_COLORS.items()}
+    pixels = bytearray(colors['gap'] * (width * 12 * cell))
+    
+    def fill(x, y, w, h, color):
+        row = color * w
+        for yy in range(y, y + h):
+            offset = (yy * width + x) * 4
+            pixels[offset:offset + w * 4] = row
+    
+    for month in range(1, 13):
+        period_mask, mood_mask, intimacy_mask = record_masks[month - 1]
+        predicted_mask, ovulation_mask, fertile_mask = forecast_masks[month - 1]
+        days_in_month = py_calendar.monthrange(year, month)[1]
+        # 纹理的第 0 行在最下面，所以 12 月在最下、1 月在最上
+        y = (12 - month) * cell + 1
+        for day in range(1, days_in_month + 1):
+            bit = 1 << (day - 1)
+            x = (day - 1) * cell
+            if period_mask & bit:
+                name = 'period'
+            elif predicted_mask & bit:
+                name = 'predicted'
+            elif ovulation_mask & bit:
+                name = 'ovulation'
+            elif fertile_mask & bit:
+                name = 'fertile'
+            else:
+                name = 'day'
+            if (year, month, day) == (today.year, today.month, today.day):
+                name = 'today'
+            fill(x, y, cell - 1, cell - 1, colors[name])
+            if mood_mask & bit:
+                fill(x, y, 2, 2, colors['mood'])
+            if intimacy_mask & bit:
+                fill(x + cell - 3, y, 2, 2, colors['intimacy'])
+    return bytes(pixels)
+
+
+class YearHeatmap(Widget):
+    """全年热力图：整年画在一张纹理上，只用一个 Rectangle 显示，点击时换算成日期"""
+    
+    def __init__(self, on_day_press=None, **kwargs):
+        super().__init__(**kwargs)
+        self.year = None
+        self.on_day_press = on_day_press
+        
+        # 放大时保持像素边缘清晰
+        self.texture = Texture.create(size=(31 * YEAR_CELL_PIXELS, 12 * YEAR_CELL_PIXELS), colorfmt='rgba')
+        self.texture.mag_filter = 'nearest'
+        self.texture.min_filter = 'nearest'
+        with self.canvas:
+            Color(1, 1, 1, 1)
+            self.rect = Rectangle(texture=self.texture, pos=self.pos, size=self.size)
+        self.bind(pos=self.update_rect, size=self.update_rect)
+    
+    def update_rect(self, *args):
+        self.rect.pos = self.pos
+        self.rect.size = self.size
+    
+    def show(self, year, pixels):
+        """换成另一年的像素（只上传纹理，不新建绘图指令）"""
+        self.year = year
+        self.texture.blit_buffer(pixels, colorfmt='rgba', bufferfmt='ubyte')
+        self.canvas.ask_update()
+    
+    def on_touch_down(self, touch):
+        if self.year is None or not self.collide_point(*touch.pos):
+            return super().on_touch_down(touch)
+        column = min(30, int((touch.x - self.x) / self.width * 31))
+        row = min(11, int((self.top - touch.y) / self.height * 12))
+        month, day = row + 1, column + 1
+        if day <= py_calendar.monthrange(self.year, month)[1] and self.on_day_press:
+            self.on_day_press(datetime(self.year, month, day))
+        return True
+
+
+class YearScreen(Screen):
+    """全年概览屏幕"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.name = 'year_view'
+        self.year = datetime.now().year
+        # 最近看过的几年的像素，按 (数据版本, 今天, 年) 缓存
+        self.year_pixels = OrderedDict()
+        
+        layout = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
+        
+        # 标题和年份切换
+        header = BoxLayout(orientation='horizontal', size_hint_y=0.1, spacing=dp(5))
+        
+        back_btn = Button(
+            text='返回',
+            size_hint=(0.2, 1),
+            background_color=(0.93, 0.6, 0.73, 1),
+            color=(1, 1, 1, 1),
+            font_name='simhei'
+        )
+        back_btn.bind(on_press=lambda x: setattr(self.manager, 'current', 'main_calendar'))
+        
+        prev_btn = Button(
+            text='◀',
+            size_hint=(0.15, 1),
+            background_color=(0.95, 0.95, 0.95, 1),
+            color=(0.93, 0.6, 0.73, 1)
+        )
+        prev_btn.bind(on_press=lambda x: self.change_year(-1))
+        
+        self.year_label = Label(
+            text=f'{self.year}年',
+            font_size=sp(22),
+            bold=True,
+            color=(0.93, 0.6, 0.73, 1),
+            font_name='simhei'
+        )
+        
+        next_btn = Button(
+            text='▶',
+            size_hint=(0.15, 1),
+            background_color=(0.95, 0.95, 0.95, 1),
+            color=(0.93, 0.6, 0.73, 1)
+        )
+        next_btn.bind(on_press=lambda x: self.change_year(1))
+        
+        header.add_widget(back_btn)
+        header.add_widget(prev_btn)
+        header.add_widget(self.year_label)
+        header.add_widget(next_btn)
+        
+        # 左侧月份标签 + 热力图
+        body = BoxLayout(orientation='horizontal', size_hint_y=0.8, spacing=dp(5))
+        month_labels = BoxLayout(orientation='vertical', size_hint_x=0.1)
+        for month in range(1, 13):
+            month_labels.add_widget(Label(
+                text=f'{month}月',
+                font_size=sp(11),
+                color=(0.7, 0.5, 0.6, 1),
+                font_name='simhei'
+            ))
+        self.heatmap = YearHeatmap(on_day_press=self.open_day, size_hint_x=0.9)
+        body.add_widget(month_labels)
+        body.add_widget(self.heatmap)
+        
+        legend = Label(
+            text='经期 / 预测经期 / 排卵日 / 易孕期   左下黄点: 心情   右下绿点: 爱爱',
+            size_hint_y=0.1,
+            font_size=sp(11),
+            color=(0.6, 0.4, 0.5, 1),
+            font_name='simhei'
+        )
+        
+        layout.add_widget(header)
+        layout.add_widget(body)
+        layout.add_widget(legend)
+        
+        self.add_widget(layout)
+    
+    def on_enter(self):
+        self.update_year()
+    
+    def change_year(self, delta):
+        self.year += delta
+        self.update_year()
+    
+    def update_year(self):
+        """显示当前年份（像素按数据版本缓存，翻年时只重新上传纹理）"""
+        app = App.get_running_app()
+        self.year_label.text = f'{self.year}年'
+        try:
+            today = datetime.now().date()
+            key = (app.refresh_version(), today, self.year)
+            pixels = self.year_pixels.get(key)
+            if pixels is None:
+                overlay = app.get_forecast_overlay()
+                pixels = build_year_pixels(
+                    self.year,
+                    [app.store.month_flags(self.year, month) for month in range(1, 13)],
+                    [overlay.get(self.year, month) for month in range(1, 13)],
+                    today
+                )
+                self.year_pixels[key] = pixels
+                while len(self.year_pixels) > 3:
+                    self.year_pixels.popitem(last=False)
+            else:
+                self.year_pixels.move_to_end(key)
+            self.heatmap.show(self.year, pixels)
+        except Exception as e:
+            print(f"显示全年概览时出错: {e}")
+    
+    def open_day(self, date):
+        """点击某天：回到月历并打开这一天的详情"""
+        main = self.manager.get_screen('main_calendar')
+        main.current_date = datetime(date.year, date.month, 1)
+        self.manager.current = 'main_calendar'
+        main.update_calendar()
+        main.update_status()
+        main.on_date_click(date)
+
 # ============================================
 # 主应用
 # ============================================
@@ -2115,6 +2781,19 @@ class PeriodTrackerApp(App):
     def build(self):
         self.title = '经期记录'
         
+        # 数据存储（默认 SQLite，旧 JSON 数据首次启动时自动导入），需在创建屏幕之前初始化
+        self.storage = open_storage(self.get_storage_backend(), self.get_data_file_path())
+        try:
+            self.storage.compact_if_needed()
+        except Exception as e:
+            print(f"整理数据存储时出错: {e}")
+        # 所有屏幕共享的内存记录缓存，连续保存在 0.5 秒窗口内合并为一次落盘
+        self.store = RecordStore(self.storage, commit_window=0.5, scheduler=self.schedule_flush)
+        # 增量预测器及其对应的数据版本，预测结果按数据版本缓存
+        self.predictor = None
+        self.predictor_version = None
+        self.prediction_cache = PredictionCache()
+        
         # 创建屏幕管理器
         self.sm = ScreenManager()
         
@@ -2123,6 +2802,7 @@ class PeriodTrackerApp(App):
             MainCalendarScreen(),
             ChartsScreen(),
             HistoryScreen(),
+            YearScreen(),
             SettingsScreen()
         ]
         
@@ -2137,34 +2817,69 @@ class PeriodTrackerApp(App):
         
         return self.sm
     
+    def on_pause(self):
+        """切到后台前把未落盘的记录写入磁盘（Android 可能随后直接结束进程），日志过长时顺便压缩"""
+        if self.flush_records():
+            try:
+                self.store.compact_if_needed()
+            except Exception as e:
+                print(f"整理数据存储时出错: {e}")
+        return True
+    
+    def on_stop(self):
+        self.flush_records()
+    
+    def schedule_flush(self, callback, delay):
+        """RecordStore 的调度钩子：组提交窗口到期后调用 callback"""
+        Clock.schedule_once(lambda dt: self.flush_records(callback), delay)
+    
+    def flush_records(self, flush=None):
+        """把未落盘的记录写入磁盘（flush 默认为 self.store.flush）"""
+        try:
+            (flush or self.store.flush)()
+            return True
+        except Exception as e:
+            print(f"保存数据时出错: {e}")
+            return False
+    
     def get_data_file_path(self):
         """获取数据文件路径"""
         return 'period_tracker_data.json'
     
+    def get_storage_backend(self):
+        """获取存储后端名称：'sqlite'（默认）或 'journal'，可用环境变量 YJ_STORAGE 覆盖"""
+        return os.environ.get('YJ_STORAGE', 'sqlite')
+    
     def load_records(self):
-        """加载所有记录"""
-        data_file = self.get_data_file_path()
-        records = []
+        """获取所有记录（共享缓存的不可变视图，文件变化时才重新加载）"""
+        records = ()
         
         try:
-            if os.path.exists(data_file):
-                with open(data_file, 'r', encoding='utf-8') as f:
-                    records = json.load(f)
+            records = self.store.records()
         except Exception as e:
             print(f"加载数据时出错: {e}")
         
         return records
     
+    def refresh_version(self):
+        """返回当前数据版本号，供各屏幕判断缓存是否有效
+
+        先经由 load_records() 检查数据文件的签名，文件被外部修改过时在这里重新加载并递增版本号，
+        而不是等到下一次写入。
+        """
+        self.load_records()
+        return self.store.version
+    
     def save_record(self, record):
-        """保存一条记录"""
-        records = self.load_records()
-        records.append(record)
-        
+        """保存一条记录（追加到日志）"""
         try:
-            data_file = self.get_data_file_path()
-            with open(data_file, 'w', encoding='utf-8') as f:
-                json.dump(records, f, ensure_ascii=False, indent=2)
-            
+            version = self.store.version
+            self.store.append(record)
+            # 预测器与写入前的数据同步时增量更新，否则下次取用时重建
+            if self.predictor is not None and self.predictor_version == version \
+                    and self.store.version == version + 1:
+                self.predictor.add(record)
+                self.predictor_version = self.store.version
             return True
         except Exception as e:
             print(f"保存数据时出错: {e}")
@@ -2173,39 +2888,64 @@ class PeriodTrackerApp(App):
     def clear_all_records(self):
         """清除所有记录"""
         try:
-            data_file = self.get_data_file_path()
-            with open(data_file, 'w', encoding='utf-8') as f:
-                json.dump([], f)
-            
+            self.store.clear()
             return True
         except Exception as e:
             print(f"清除数据时出错: {e}")
             return False
     
-    def get_records_for_date(self, date):
-        """获取指定日期的记录"""
-        date_str = date.strftime('%Y-%m-%d')
+    def get_predictor(self):
+        """获取与当前数据同步的预测器（新增记录时增量更新，数据被外部修改时重建）"""
         records = self.load_records()
-        date_records = []
+        if self.predictor is None or self.predictor_version != self.store.version:
+            self.predictor = IncrementalCyclePredictor(records)
+            self.predictor_version = self.store.version
+        return self.predictor
+    
+    def get_prediction(self):
+        """下次经期预测（按数据版本缓存，各屏幕共用）"""
+        predictor = self.get_predictor()
+        return self.prediction_cache.get(self.store.version, 'next_period',
+                                         predictor.predict_next_period)
+    
+    def get_prediction_interval(self):
+        """下次经期开始日期的预测区间 {置信度: (下界, 上界)}（按数据版本缓存）"""
+        predictor = self.get_predictor()
+        return self.prediction_cache.get(
+            self.store.version, 'next_period_interval',
+            lambda: predictor.predict_next_period(interval=INTERVAL_LEVELS)[4])
+    
+    def get_cycle_statistics(self):
+        """周期统计（按数据版本缓存，各屏幕共用）"""
+        predictor = self.get_predictor()
+        return self.prediction_cache.get(self.store.version, 'statistics',
+                                         predictor.get_cycle_statistics)
+    
+    def get_forecast_overlay(self):
+        """日历的预测日叠加层（按数据版本缓存，翻月时逐步展开后续周期）"""
+        predictor = self.get_predictor()
+        return self.prediction_cache.get(self.store.version, 'forecast_overlay',
+                                         lambda: ForecastOverlay(predictor.iter_forecast()))
+    
+    def get_cycle_day_analysis(self):
+        """心情/症状按周期日和阶段的分布（按数据版本缓存）"""
+        predictor = self.get_predictor()
         
-        for record in records:
-            # 检查经期记录
-            if record.get('type') == 'period':
-                start_date = record.get('start_date')
-                end_date = record.get('end_date') or start_date
-                if start_date and end_date:
-                    try:
-                        start = datetime.strptime(start_date, '%Y-%m-%d')
-                        end = datetime.strptime(end_date, '%Y-%m-%d')
-                        if start <= date <= end:
-                            date_records.append(record)
-                    except:
-                        pass
-            # 检查其他记录
-            elif record.get('date') == date_str:
-                date_records.append(record)
-        
-        return date_records
+        def analyze():
+            return symptom_mood_cycle_analysis(
+                self.store.records_of_type('mood_symptom'), predictor.period_starts,
+                default_cycle=predictor.estimate_cycle_length(),
+                period_length=round(predictor.calculate_avg_period_length()))
+        
+        return self.prediction_cache.get(self.store.version, 'cycle_days', analyze)
+    
+    def get_records_for_date(self, date):
+        """获取指定日期的记录"""
+        try:
+            return self.store.records_for_date(date)
+        except Exception as e:
+            print(f"查询数据时出错: {e}")
+            return ()
     
     def show_popup(self, title, message):
         """显示弹窗"""
@@ -0,0 +1,273 @@
+"""
+经期记录App - 图表数据处理
+不依赖 Kivy，图表控件和基准脚本共用
+包含：长序列降采样（LTTB）、坐标轴标签稀疏化、按周期日/阶段统计症状和心情
+"""
+
+import bisect
+from functools import lru_cache
+
+import numpy as np
+
+from yj_predictor import LUTEAL_DAYS, MAX_CYCLE, MIN_CYCLE
+from yj_storage import MoodSymptomRecord, as_records, normalize_symptom
+
+# ============================================
+# 长序列降采样
+# ============================================
+
+def lttb_indices(values, threshold, keep_extremes=True):
+    """Largest-Triangle-Three-Buckets 降采样，返回保留点的下标（升序，含首尾）
+
+    横坐标取下标。首尾之外的点均分为 threshold - 2 个桶，每个桶保留与前一个保留点、
+    下一个桶均值构成的三角形面积最大的点。keep_extremes 为真时全局最小值和最大值一定保留
+    （替换所在桶选出的点；两者在同一个桶时都保留，结果比 threshold 多一个点）。
+    """
+    n = len(values)
+    if threshold >= n:
+        return list(range(n))
+    if threshold < 3:
+        return [0, n - 1] if n > 1 else list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    chosen = []
+    a = 0
+    for i in range(threshold - 2):
+        # 下一个桶的均值（最后一个桶用终点）
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        if avg_start >= n - 1:
+            avg_x, avg_y = n - 1, values[n - 1]
+        else:
+            count = avg_end - avg_start
+            avg_x = (avg_start + avg_end - 1) / 2
+            avg_y = sum(values[avg_start:avg_end]) / count
+
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        value_a = values[a]
+        max_area = -1
+        next_a = range_start
+        for j in range(range_start, range_end):
+            area = abs((a - avg_x) * (values[j] - value_a) - (a - j) * (avg_y - value_a))
+            if area > max_area:
+                max_area = area
+                next_a = j
+        chosen.append((range_start, range_end, next_a))
+        a = next_a
+
+    indices = [0] + [index for _, _, index in chosen] + [n - 1]
+    if keep_extremes:
+        extremes = {min(range(n), key=values.__getitem__), max(range(n), key=values.__getitem__)}
+        starts = [start for start, _, _ in chosen]
+        replaced = {}
+        for extreme in extremes:
+            if extreme in (0, n - 1):
+                continue
+            bucket = bisect.bisect_right(starts, extreme) - 1
+            replaced.setdefault(bucket, []).append(extreme)
+        extra = []
+        for bucket, points in replaced.items():
+            indices[bucket + 1] = points[0]
+            extra.extend(points[1:])
+        indices = sorted(set(indices + extra))
+    return indices
+
+
+def point_budget(pixel_width, min_spacing):
+    """按绘图宽度（像素）和点的最小间距估算降采样的点数上限（至少 3）"""
+    return max(3, int(pixel_width / min_spacing) + 1)
+
+# ============================================
+# 标签稀疏化
+# ============================================
+
+def thin_labels(centers, widths, gap=0, keep=()):
+    """选出互不重叠的标签，返回下标列表（升序）
+
+    centers/widths 为各标签中心的横坐标和宽度。keep 中的下标（如最大值、最小值）先放，
+    其余从左到右依次放入，与已放置的标签间距小于 gap 时跳过。
+    """
+    placed = []  # 已放置标签的 (左边界, 右边界)，按左边界排序
+    selected = set()
+
+    def fits(i):
+        left = centers[i] - widths[i] / 2
+        right = centers[i] + widths[i] / 2
+        pos = bisect.bisect_left(placed, (left, right))
+        if pos > 0 and placed[pos - 1][1] + gap > left:
+            return False
+        if pos < len(placed) and placed[pos][0] - gap < right:
+            return False
+        placed.insert(pos, (left, right))
+        return True
+
+    for i in keep:
+        if 0 <= i < len(centers) and i not in selected and fits(i):
+            selected.add(i)
+    for i in range(len(centers)):
+        if i not in selected and fits(i):
+            selected.add(i)
+    return sorted(selected)
+
+# ============================================
+# 周期日分析
+# ============================================
+
+PHASES = ('月经期', '卵泡期', '排卵期', '黄体期')
+MENSTRUAL, FOLLICULAR, OVULATORY, LUTEAL = range(4)
+
+
+def _ordinals(days):
+    """日期（datetime/date）或日序号序列转成 int64 数组"""
+    if isinstance(days, np.ndarray):
+        return days.astype(np.int64, copy=False)
+    days = list(days)
+    if days and not isinstance(days[0], (int, np.integer)):
+        days = [d.toordinal() for d in days]
+    return np.fromiter(days, dtype=np.int64, count=len(days))
+
+
+class _LabelCodes(dict):
+    """标签 -> 连续编号，第一次出现时分配"""
+
+    def __missing__(self, label):
+        code = self[label] = len(self)
+        return code
+
+
+@lru_cache(maxsize=1024)
+def _clean_symptoms(symptoms):
+    """一条记录的症状元组清理后的键（症状组合重复很多，按元组缓存）"""
+    return tuple(key for key in map(normalize_symptom, symptoms) if key is not None)
+
+
+def cycle_day_offsets(period_starts, days):
+    """每个日期是所在周期的第几天（从 0 起）以及该周期的长度
+
+    period_starts 为经期开始日期（datetime/date 或日序号，如 CyclePredictor.period_starts），
+    days 为要定位的日期。返回 (offsets, cycle_lengths) 两个 int64 数组：
+    第一次经期之前的日期 offset 为 -1；最后一个周期尚未结束，长度记为 0。
+    """
+    starts = np.unique(_ordinals(period_starts))
+    days = _ordinals(days)
+    if not len(starts) or not len(days):
+        return np.full(len(days), -1, dtype=np.int64), np.zeros(len(days), dtype=np.int64)
+    pos = np.searchsorted(starts, days, side='right') - 1
+    safe = np.maximum(pos, 0)
+    offsets = np.where(pos >= 0, days - starts[safe], -1)
+    next_pos = np.minimum(safe + 1, len(starts) - 1)
+    lengths = np.where((pos >= 0) & (pos + 1 < len(starts)), starts[next_pos] - starts[safe], 0)
+    return offsets, lengths
+
+
+def cycle_phases(offsets, cycle_lengths, default_cycle, period_length=5, luteal_days=LUTEAL_DAYS):
+    """按周期日判断所处阶段（PHASES 的下标）
+
+    排卵日 = 周期长度 - 黄体期天数（与预测算法一致），前后各一天为排卵期；
+    周期开始的 period_length 天为月经期（优先）。尚未结束的周期和长度不在 20-45 天的周期
+    （多半漏记了一次经期）用 default_cycle 作为长度。
+    """
+    plausible = (cycle_lengths >= MIN_CYCLE) & (cycle_lengths <= MAX_CYCLE)
+    lengths = np.where(plausible, cycle_lengths, int(round(default_cycle)))
+    ovulation = lengths - luteal_days
+    return np.select(
+        [offsets < period_length, offsets < ovulation - 1, offsets <= ovulation + 1],
+        [MENSTRUAL, FOLLICULAR, OVULATORY],
+        default=LUTEAL,
+    )
+
+
+def cycle_day_matrix(period_starts, event_days, event_labels, max_day=MAX_CYCLE,
+                     default_cycle=28, period_length=5, luteal_days=LUTEAL_DAYS, top_k=None):
+    """把带标签的事件（如某天出现某症状）按周期日和阶段汇总
+
+    返回字典：
+    - labels：标签列表（按总次数从多到少，top_k 限制行数）
+    - days：(标签数, max_day) 的计数矩阵，第 d 列为周期第 d+1 天
+    - phases：(标签数, 4) 的计数矩阵，列顺序同 PHASES
+    - counted：计入统计的事件数（第一次经期之前和超过 max_day 天的周期日不计）
+    """
+    offsets, lengths = cycle_day_offsets(period_starts, event_days)
+    names = _LabelCodes()
+    codes = np.fromiter(map(names.__getitem__, event_labels), dtype=np.int64, count=len(event_labels))
+    labels = list(names)
+
+    valid = (offsets >= 0) & (offsets < max_day)
+    codes = codes[valid]
+    offsets = offsets[valid]
+    lengths = lengths[valid]
+    phases = cycle_phases(offsets, lengths, default_cycle, period_length, luteal_days)
+
+    n = len(labels)
+    days = np.bincount(codes * max_day + offsets, minlength=n * max_day).reshape(n, max_day)
+    phase_counts = np.bincount(codes * len(PHASES) + phases, minlength=n * len(PHASES)).reshape(n, len(PHASES))
+
+    # 按总次数排序（次数相同时先出现的在前），去掉没有计入的标签，只保留前 top_k 行
+    totals = days.sum(axis=1)
+    order = np.argsort(-totals, kind='stable')
+    order = order[totals[order] > 0]
+    if top_k is not None:
+        order = order[:top_k]
+    return {
+        'labels': [labels[i] for i in order],
+        'days': days[order],
+        'phases': phase_counts[order],
+        'counted': int(valid.sum()),
+    }
+
+
+def symptom_mood_cycle_analysis(records, period_starts, top_k=8, **kwargs):
+    """心情/症状记录按周期日和阶段的分布
+
+    返回 {'symptoms': cycle_day_matrix(...), 'moods': cycle_day_matrix(...)}，
+    症状文本与症状频率统计一样经过 normalize_symptom 清理。kwargs 传给 cycle_day_matrix。
+    """
+    record_days = []      # 每条心情/症状记录的日序号
+    symptom_counts = []   # 每条记录清理后的症状个数，用来把日期重复到每个症状
+    symptom_labels = []
+    mood_days = []
+    mood_labels = []
+    for record in as_records(records):
+        if not isinstance(record, MoodSymptomRecord):
+            continue
+        if record.mood:
+            mood_days.append(record.day)
+            mood_labels.append(record.mood)
+        keys = _clean_symptoms(record.symptoms)
+        record_days.append(record.day)
+        symptom_counts.append(len(keys))
+        symptom_labels.extend(keys)
+    symptom_days = np.repeat(np.asarray(record_days, dtype=np.int64),
+                             np.asarray(symptom_counts, dtype=np.int64))
+    return {
+        'symptoms': cycle_day_matrix(period_starts, symptom_days, symptom_labels, top_k=top_k, **kwargs),
+        'moods': cycle_day_matrix(period_starts, mood_days, mood_labels, top_k=top_k, **kwargs),
+    }
+
+
+def phase_summary(result):
+    """每个标签最集中的阶段：[(标签, 阶段名, 占比)]"""
+    summary = []
+    for label, counts in zip(result['labels'], result['phases']):
+        total = int(counts.sum())
+        if total:
+            phase = int(np.argmax(counts))
+            summary.append((label, PHASES[phase], float(counts[phase] / total)))
+    return summary
+
+
+def heatmap_pixels(matrix, low=(250, 240, 245), high=(230, 90, 140)):
+    """计数矩阵转成 RGBA 像素（每格一个像素，第 0 行在最上面）
+
+    每行按本行最大值归一化，在 low 和 high 两种颜色之间插值，便于看出各标签集中在哪几天。
+    返回可直接传给 Texture.blit_buffer 的 bytes（纹理原点在左下角，所以行序上下翻转）。
+    """
+    counts = np.asarray(matrix, dtype=np.float64)
+    peaks = counts.max(axis=1, keepdims=True) if counts.size else counts
+    ratio = np.divide(counts, peaks, out=np.zeros_like(counts), where=peaks > 0)[::-1]
+    low = np.asarray(low, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    rgb = low + ratio[..., None] * (high - low)
+    alpha = np.full(ratio.shape + (1,), 255.0)
+    return np.concatenate([rgb, alpha], axis=-1).round().astype(np.uint8).tobytes()
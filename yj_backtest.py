@@ -0,0 +1,152 @@
+"""
+经期记录App - 预测准确度回测
+按时间顺序重放每个用户的经期开始日期，在每个历史时刻只用此前的数据预测下一次开始日期，
+统计误差（预测 - 实际，单位：天）。不导入 Kivy。
+
+与 CyclePredictor.calculate_weighted_average_cycle 的算法相同：最近 n_recent 个有效周期
+（20-45 天）加权平均，第 i 个周期的权重 = (i / 经期次数) * 2 + 0.5。
+权重拆成 2/m * i + 0.5 后，窗口内的 Σv、Σi·v、Σi 都可以由有效周期的前缀和相减得到，
+整个重放是 O(n)，而不是在每个时刻重新构造 CyclePredictor 的 O(n²)。
+
+用法: python yj_backtest.py DATA_DIR [-o results.jsonl] [--workers N] [--all-gaps]
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+
+from yj_batch import find_user_files, map_users
+from yj_predictor import DEFAULT_CYCLE, MAX_CYCLE, MIN_CYCLE
+from yj_storage import PeriodRecord, as_records, load_records_file
+
+
+def backtest_starts(starts, n_recent=6, plausible_only=True):
+    """回测一串升序的经期开始日序号，返回每次预测的 (目标下标, 误差天数) 列表
+
+    在第 m 个开始日（m >= 2）之前，用 starts[:m] 预测 starts[m]。
+    plausible_only 为真时只评估实际间隔在 20-45 天的目标，
+    更长的间隔多半是漏记，为 0 的是重复记录，计入误差会掩盖算法本身的表现。
+    """
+    # 有效周期（以结束处的下标 i 计）的前缀和：个数、Σv、Σi·v、Σi
+    prefix_v = [0]
+    prefix_iv = [0]
+    prefix_i = [0]
+    results = []
+    for m in range(1, len(starts)):
+        if m >= 2:
+            actual = starts[m] - starts[m - 1]
+            if not plausible_only or MIN_CYCLE <= actual <= MAX_CYCLE:
+                count = len(prefix_v) - 1
+                k = min(n_recent, count)
+                if k:
+                    lo = count - k
+                    sum_v = prefix_v[-1] - prefix_v[lo]
+                    sum_iv = prefix_iv[-1] - prefix_iv[lo]
+                    sum_i = prefix_i[-1] - prefix_i[lo]
+                    avg_cycle = (2 * sum_iv / m + 0.5 * sum_v) / (2 * sum_i / m + 0.5 * k)
+                else:
+                    avg_cycle = DEFAULT_CYCLE
+                results.append((m, avg_cycle - actual))
+
+        # 把以 m 结束的周期加入前缀和，供之后的时刻使用
+        length = starts[m] - starts[m - 1]
+        if MIN_CYCLE <= length <= MAX_CYCLE:
+            prefix_v.append(prefix_v[-1] + length)
+            prefix_iv.append(prefix_iv[-1] + m * length)
+            prefix_i.append(prefix_i[-1] + m)
+    return results
+
+
+def summarize_errors(errors):
+    """误差汇总：次数、平均绝对误差、偏差（正数表示预测偏晚）、均方根误差"""
+    n = len(errors)
+    if not n:
+        return {'predictions': 0, 'mae': None, 'bias': None, 'rmse': None}
+    return {
+        'predictions': n,
+        'mae': sum(abs(e) for e in errors) / n,
+        'bias': sum(errors) / n,
+        'rmse': math.sqrt(sum(e * e for e in errors) / n),
+    }
+
+
+def period_start_ordinals(records):
+    """记录中所有经期开始日序号（升序，保留重复，与 CyclePredictor.period_starts 一致）"""
+    return sorted(r.start for r in as_records(records) if isinstance(r, PeriodRecord))
+
+
+def backtest_user(item, n_recent=6, plausible_only=True):
+    """回测单个用户（在工作进程中运行）"""
+    user, path = item
+    try:
+        starts = period_start_ordinals(load_records_file(path))
+        errors = [e for _, e in backtest_starts(starts, n_recent, plausible_only)]
+        result = {'user': user, 'periods': len(starts)}
+        result.update(summarize_errors(errors))
+        return result
+    except Exception as e:
+        return {'user': user, 'error': f"{type(e).__name__}: {e}"}
+
+
+def _backtest_all_gaps(item):
+    return backtest_user(item, plausible_only=False)
+
+
+def run_backtest(data_dir, out, workers=None, chunksize=None, plausible_only=True):
+    """并行回测目录下所有用户，逐行写入 out，返回 (用户数, 出错数, 全体汇总, 耗时)"""
+    items = find_user_files(data_dir)
+    task = backtest_user if plausible_only else _backtest_all_gaps
+
+    errors = 0
+    n = 0
+    abs_sum = 0.0
+    err_sum = 0.0
+    sq_sum = 0.0
+    start = time.perf_counter()
+    for result in map_users(task, items, workers, chunksize):
+        if 'error' in result:
+            errors += 1
+        elif result['predictions']:
+            # 用各用户的汇总值还原总和，按预测次数加权合并
+            count = result['predictions']
+            n += count
+            abs_sum += result['mae'] * count
+            err_sum += result['bias'] * count
+            sq_sum += result['rmse'] ** 2 * count
+        out.write(json.dumps(result, ensure_ascii=False) + '\n')
+    out.flush()
+
+    overall = {'predictions': n, 'mae': abs_sum / n if n else None,
+               'bias': err_sum / n if n else None, 'rmse': math.sqrt(sq_sum / n) if n else None}
+    return len(items), errors, overall, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='回测各用户的经期预测准确度')
+    parser.add_argument('data_dir', help='存放各用户数据文件的目录')
+    parser.add_argument('-o', '--output', help='输出 JSONL 文件，默认写到标准输出')
+    parser.add_argument('--workers', type=int, default=None, help='进程数，默认等于 CPU 核数')
+    parser.add_argument('--all-gaps', action='store_true',
+                        help='也评估间隔不在 20-45 天的目标（默认跳过漏记和重复记录）')
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        count, errors, overall, elapsed = run_backtest(args.data_dir, out, args.workers,
+                                                       plausible_only=not args.all_gaps)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"回测 {count} 个用户（{errors} 个出错），耗时 {elapsed:.2f}s，{rate:.1f} 用户/秒",
+          file=sys.stderr)
+    if overall['predictions']:
+        print(f"共 {overall['predictions']} 次预测：MAE {overall['mae']:.2f} 天，"
+              f"偏差 {overall['bias']:+.2f} 天，RMSE {overall['rmse']:.2f} 天", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
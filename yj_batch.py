@@ -0,0 +1,127 @@
+"""
+经期记录App - 无界面批量预测
+扫描目录下每个用户的数据文件，用进程池并行计算下次经期预测和周期统计，
+结果逐行写成 JSONL，并报告吞吐量（用户/秒）。不导入 Kivy，也不做字体设置。
+
+用法: python yj_batch.py DATA_DIR [-o results.jsonl] [--workers N]
+
+支持的目录布局：
+    DATA_DIR/<用户>.json            JSON 快照（同名 .journal 日志会一并重放）
+    DATA_DIR/<用户>.journal         只有日志、还没压缩过的 JSON 存储（按同名快照路径加载）
+    DATA_DIR/<用户>.db              SQLite 数据库
+    DATA_DIR/<用户>/period_tracker_data.json、.journal 或 .db
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from yj_predictor import CyclePredictor
+from yj_storage import JOURNAL_SUFFIX, load_records_file
+
+# 同一用户有多种文件时按此顺序选用：SQLite 优先，只有日志时也算一个用户
+DATA_EXTENSIONS = ('.db', '.json', JOURNAL_SUFFIX)
+APP_DATA_NAME = 'period_tracker_data'
+
+
+def _data_path(path):
+    """日志文件换成同名的快照路径，由 load_records_file 加载快照（可能不存在）并重放日志"""
+    stem, ext = os.path.splitext(path)
+    return stem + '.json' if ext == JOURNAL_SUFFIX else path
+
+
+def find_user_files(data_dir):
+    """返回按用户名排序的 [(用户, 数据文件路径)]"""
+    users = {}
+    for entry in sorted(os.listdir(data_dir)):
+        path = os.path.join(data_dir, entry)
+        if os.path.isdir(path):
+            for ext in DATA_EXTENSIONS:
+                candidate = os.path.join(path, APP_DATA_NAME + ext)
+                if os.path.exists(candidate):
+                    users.setdefault(entry, _data_path(candidate))
+                    break
+            continue
+        user, ext = os.path.splitext(entry)
+        if ext in DATA_EXTENSIONS:
+            current = users.get(user)
+            if current is None or DATA_EXTENSIONS.index(ext) < DATA_EXTENSIONS.index(
+                    os.path.splitext(current)[1]):
+                users[user] = _data_path(path)
+    return sorted(users.items())
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def predict_user(item):
+    """计算单个用户的预测结果（在工作进程中运行）"""
+    user, path = item
+    try:
+        predictor = CyclePredictor(load_records_file(path))
+        next_start, next_end, ovulation, fertile_window = predictor.predict_next_period()
+        stats = predictor.get_cycle_statistics()
+        stats.pop('cycle_lengths', None)
+        if 'std_cycle' in stats:
+            stats['std_cycle'] = float(stats['std_cycle'])
+        return {
+            'user': user,
+            'records': len(predictor.records),
+            'next_period_start': _iso(next_start),
+            'next_period_end': _iso(next_end),
+            'ovulation_date': _iso(ovulation),
+            'fertile_window': [_iso(d) for d in fertile_window] if fertile_window else None,
+            'statistics': stats,
+        }
+    except Exception as e:
+        return {'user': user, 'error': f"{type(e).__name__}: {e}"}
+
+
+def map_users(task, items, workers=None, chunksize=None):
+    """在进程池中对每个 (用户, 路径) 调用 task，按用户顺序逐个产出结果"""
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(items) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(task, items, chunksize=chunksize)
+
+
+def run_batch(data_dir, out, workers=None, chunksize=None):
+    """并行处理目录下所有用户，结果按用户顺序流式写入 out，返回 (用户数, 出错数, 耗时)"""
+    items = find_user_files(data_dir)
+
+    errors = 0
+    start = time.perf_counter()
+    for result in map_users(predict_user, items, workers, chunksize):
+        if 'error' in result:
+            errors += 1
+        out.write(json.dumps(result, ensure_ascii=False) + '\n')
+    out.flush()
+    return len(items), errors, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='批量计算各用户的经期预测')
+    parser.add_argument('data_dir', help='存放各用户数据文件的目录')
+    parser.add_argument('-o', '--output', help='输出 JSONL 文件，默认写到标准输出')
+    parser.add_argument('--workers', type=int, default=None, help='进程数，默认等于 CPU 核数')
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        count, errors, elapsed = run_batch(args.data_dir, out, args.workers)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"处理 {count} 个用户（{errors} 个出错），耗时 {elapsed:.2f}s，{rate:.1f} 用户/秒",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,593 @@
+"""
+经期记录App - 智能预测算法
+不依赖 Kivy，界面和无界面的批量任务共用
+包含：单用户预测 CyclePredictor、增量预测 IncrementalCyclePredictor、预测结果缓存、
+      日历预测叠加层、多用户向量化批量计算
+"""
+
+import bisect
+import math
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+from yj_storage import PeriodRecord, as_records, parse_record
+
+MIN_CYCLE = 20           # 合理周期范围
+MAX_CYCLE = 45
+DEFAULT_CYCLE = 28
+LUTEAL_DAYS = 14         # 黄体期天数（排卵日到下次经期）
+INTERVAL_LEVELS = (0.8, 0.95)  # 默认的预测区间置信度
+INTERVAL_RESAMPLES = 10000
+INTERVAL_RECENT = 12     # 预测区间只用最近的有效周期
+
+# ============================================
+# 智能预测算法类
+# ============================================
+
+def std_from_moments(n, total, total_sq):
+    """由整数的个数、和、平方和计算总体标准差（与 np.std 相同，ddof=0）
+
+    周期长度都是整数，n*Σx² - (Σx)² 可以精确计算，只在最后开方和相除时各舍入一次，
+    标量、向量化和增量三种实现据此得到完全一致的结果。
+    """
+    return math.sqrt(n * total_sq - total * total) / n
+
+
+class CyclePredictor:
+    """智能周期预测算法"""
+    
+    def __init__(self, records, strategy=None):
+        # 接受字典或带类型的记录，日期只解析一次
+        # strategy 为 yj_strategies 中的预测策略，None 表示内置的加权平均
+        self.strategy = strategy
+        self.records = as_records(records)
+        self.period_records = [r for r in self.records if isinstance(r, PeriodRecord)]
+        self.period_starts = self.extract_period_starts()
+        
+    def extract_period_starts(self):
+        """提取所有经期开始日期"""
+        return [datetime.fromordinal(start) for start in sorted(r.start for r in self.period_records)]
+    
+    def calculate_weighted_average_cycle(self, n_recent=6):
+        """计算加权平均周期长度（最近的数据权重更高）"""
+        if len(self.period_starts) < 2:
+            return 28  # 默认周期
+        
+        cycle_lengths = []
+        for i in range(1, len(self.period_starts)):
+            days_diff = (self.period_starts[i] - self.period_starts[i-1]).days
+            if 20 <= days_diff <= 45:  # 合理的周期范围
+                cycle_lengths.append((days_diff, i))  # 保存周期长度和索引
+        
+        if not cycle_lengths:
+            return 28
+        
+        # 计算权重：最近的数据权重更高
+        weights = []
+        values = []
+        
+        for length, idx in cycle_lengths[-n_recent:]:  # 只考虑最近的n个周期
+            weight = (idx / len(self.period_starts)) * 2 + 0.5  # 最近的数据权重更高
+            weights.append(weight)
+            values.append(length)
+        
+        # 加权平均
+        weighted_sum = sum(w * v for w, v in zip(weights, values))
+        total_weight = sum(weights)
+        
+        return weighted_sum / total_weight if total_weight > 0 else 28
+    
+    def estimate_cycle_length(self):
+        """下一个周期的长度估计：默认加权平均，指定策略时由策略计算"""
+        if self.strategy is None:
+            return self.calculate_weighted_average_cycle()
+        return self.strategy.estimate([d.toordinal() for d in self.period_starts])
+    
+    def predict_next_period(self, interval=None, n_resamples=INTERVAL_RESAMPLES, seed=0):
+        """预测下一个经期
+
+        interval 为置信度序列（如 (0.8, 0.95)）时多返回第 5 项：
+        {置信度: (开始日期下界, 开始日期上界)}，有效周期不足两个时为 None。
+        """
+        prediction = next(self.iter_forecast(1), (None, None, None, None))
+        if interval is None:
+            return prediction
+        next_period_start = prediction[0]
+        bounds = None
+        if next_period_start is not None:
+            offsets = bootstrap_cycle_interval(self.get_cycle_statistics().get('cycle_lengths', []),
+                                               interval, n_resamples, seed)
+            if offsets is not None:
+                bounds = {level: (next_period_start + timedelta(days=lo),
+                                  next_period_start + timedelta(days=hi))
+                          for level, (lo, hi) in offsets.items()}
+        return prediction + (bounds,)
+    
+    def iter_forecast(self, n_cycles=None):
+        """依次生成之后的 n_cycles 个周期（None 表示不限），平均周期和经期长度只计算一次
+
+        每项与 predict_next_period() 的返回值形式相同：
+        (经期开始, 经期结束, 排卵日, (易孕期开始, 易孕期结束))
+        """
+        if len(self.period_starts) < 2:
+            return
+        
+        avg_cycle = self.estimate_cycle_length()
+        avg_period_length = self.calculate_avg_period_length()
+        last_period_start = self.period_starts[-1]
+        luteal_days = self.strategy.luteal_days if self.strategy is not None else LUTEAL_DAYS
+        
+        k = 1
+        while n_cycles is None or k <= n_cycles:
+            # 预测第 k 个经期开始日期
+            next_period_start = last_period_start + timedelta(days=avg_cycle * k)
+            
+            # 预测排卵期（基于黄体期通常为14天）
+            ovulation_date = next_period_start - timedelta(days=luteal_days)
+            
+            # 预测易孕期（排卵期前后几天）
+            fertile_start = ovulation_date - timedelta(days=5)
+            fertile_end = ovulation_date + timedelta(days=1)
+            
+            # 预测经期结束日期（基于历史平均经期长度）
+            next_period_end = next_period_start + timedelta(days=avg_period_length - 1)
+            
+            yield next_period_start, next_period_end, ovulation_date, (fertile_start, fertile_end)
+            k += 1
+    
+    def calculate_avg_period_length(self):
+        """计算平均经期长度"""
+        lengths = []
+        for record in self.period_records:
+            if record.end is not None:
+                length = record.end - record.start + 1
+                if 2 <= length <= 10:  # 合理的经期长度范围
+                    lengths.append(length)
+        
+        return sum(lengths) / len(lengths) if lengths else 5
+    
+    def get_cycle_statistics(self):
+        """获取周期统计数据"""
+        if len(self.period_starts) < 2:
+            return {}
+        
+        # 计算周期长度
+        cycle_lengths = []
+        for i in range(1, len(self.period_starts)):
+            days_diff = (self.period_starts[i] - self.period_starts[i-1]).days
+            if 20 <= days_diff <= 45:
+                cycle_lengths.append(days_diff)
+        
+        if not cycle_lengths:
+            return {}
+        
+        # 计算统计数据
+        stats = {
+            'avg_cycle': sum(cycle_lengths) / len(cycle_lengths),
+            'min_cycle': min(cycle_lengths),
+            'max_cycle': max(cycle_lengths),
+            'std_cycle': std_from_moments(len(cycle_lengths), sum(cycle_lengths),
+                                          sum(v * v for v in cycle_lengths)) if len(cycle_lengths) > 1 else 0,
+            'cycle_count': len(cycle_lengths),
+            'cycle_lengths': cycle_lengths,
+            'irregularity': self.calculate_irregularity_score(cycle_lengths)
+        }
+        
+        return stats
+    
+    def calculate_irregularity_score(self, cycle_lengths):
+        """计算周期不规律性评分（0-100，越高越不规律）"""
+        if len(cycle_lengths) < 3:
+            return 0
+        
+        # 计算相邻周期差异
+        diffs = []
+        for i in range(1, len(cycle_lengths)):
+            diffs.append(abs(cycle_lengths[i] - cycle_lengths[i-1]))
+        
+        avg_diff = sum(diffs) / len(diffs)
+        max_possible_diff = 25  # 最大可能的周期差异
+        
+        # 将平均差异转换为0-100的评分
+        score = min(100, (avg_diff / max_possible_diff) * 100)
+        return round(score, 1)
+
+# ============================================
+# 预测区间
+# ============================================
+
+@lru_cache(maxsize=32)
+def _resample_indices(k, n_resamples, seed):
+    """固定大小的重抽样下标矩阵 (n_resamples, k + 1)，同样的参数总是得到同一个（只读）矩阵"""
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, k, size=(n_resamples, k + 1), dtype=np.uint8)
+    indices.setflags(write=False)
+    return indices
+
+
+def bootstrap_cycle_interval(cycle_lengths, levels=INTERVAL_LEVELS, n_resamples=INTERVAL_RESAMPLES,
+                             seed=0, n_recent=INTERVAL_RECENT):
+    """对最近的有效周期长度做自助法重抽样，估计下一个周期长度的预测区间
+
+    每次重抽样取 k 个周期求均值（估计本身的误差），再加上一个随机周期与样本均值之差
+    （单个周期自身的波动）。返回 {置信度: (下界, 上界)}，单位为天，相对于点估计的偏移；
+    有效周期不足两个时返回 None。全部用整数运算（结果放大 k 倍），分位数由计数直方图得到。
+    """
+    recent = cycle_lengths[-n_recent:]
+    k = len(recent)
+    if k < 2:
+        return None
+    values = np.asarray(recent, dtype=np.int16)
+    samples = values[_resample_indices(k, n_resamples, seed)]
+    # k * (均值 + 随机周期 - 2 * 样本均值)，样本均值项是常数，最后再减
+    scaled = samples[:, :k].sum(axis=1, dtype=np.int32) + k * samples[:, k].astype(np.int32)
+    low = int(scaled.min())
+    cumulative = np.cumsum(np.bincount(scaled - low))
+    center = 2 * int(values.sum())
+
+    result = {}
+    for level in levels:
+        tail = (1 - level) / 2
+        lo = int(np.searchsorted(cumulative, tail * n_resamples)) + low
+        hi = int(np.searchsorted(cumulative, (1 - tail) * n_resamples)) + low
+        result[level] = ((lo - center) / k, (hi - center) / k)
+    return result
+
+# ============================================
+# 增量预测
+# ============================================
+
+class IncrementalCyclePredictor(CyclePredictor):
+    """增量维护状态的预测器，新增一条经期记录只做局部更新
+
+    维护的状态：
+    - 升序的经期开始日序号（允许重复，与 CyclePredictor 一致）
+    - 有效周期：以周期结束处的开始日序号为键，一个键至多对应一个有效周期
+    - 有效周期长度的个数、和、平方和（整数，等价于 Welford 的均值/方差但没有浮点误差）
+      以及 20-45 天的计数直方图（最小/最大值）
+    - 相邻有效周期差值绝对值之和（不规律性）
+    插入定位为 O(log n)，加权平均只看最近 n_recent 个有效周期，
+    所有结果与对同样记录整体计算的 CyclePredictor 完全相同。
+    """
+
+    def __init__(self, records=(), strategy=None):
+        # 不调用父类构造，所有状态在 add() 中增量建立
+        self.strategy = strategy
+        self.records = []
+        self.period_records = []
+        self.period_starts = []
+        self._starts = []
+        self._cycle_keys = []
+        self._cycle_lengths = {}
+        self._total = 0
+        self._total_sq = 0
+        self._length_counts = [0] * (MAX_CYCLE - MIN_CYCLE + 1)
+        self._abs_diff_sum = 0
+        self._period_length_sum = 0
+        self._period_length_count = 0
+        for record in as_records(records):
+            self.add(record)
+
+    def add(self, record):
+        """加入一条记录（字典或带类型的记录）"""
+        if isinstance(record, dict):
+            record = parse_record(record)
+        self.records.append(record)
+        if not isinstance(record, PeriodRecord):
+            return
+        self.period_records.append(record)
+        if record.end is not None and 2 <= record.end - record.start + 1 <= 10:
+            self._period_length_sum += record.end - record.start + 1
+            self._period_length_count += 1
+        self._add_start(record.start)
+
+    def _add_start(self, start):
+        starts = self._starts
+        pos = bisect.bisect_right(starts, start)
+        prev = starts[pos - 1] if pos > 0 else None
+        nxt = starts[pos] if pos < len(starts) else None
+
+        # 原来相邻的 (prev, nxt) 被拆成 (prev, start) 和 (start, nxt)
+        if prev is not None and nxt is not None:
+            self._remove_cycle(nxt)
+        starts.insert(pos, start)
+        self.period_starts.insert(pos, datetime.fromordinal(start))
+        if prev is not None and prev < start:
+            self._add_cycle(start, start - prev)
+        if nxt is not None:
+            self._add_cycle(nxt, nxt - start)
+
+    def _add_cycle(self, key, length):
+        if not MIN_CYCLE <= length <= MAX_CYCLE:
+            return
+        keys = self._cycle_keys
+        pos = bisect.bisect_left(keys, key)
+        left = self._cycle_lengths[keys[pos - 1]] if pos > 0 else None
+        right = self._cycle_lengths[keys[pos]] if pos < len(keys) else None
+        if left is not None and right is not None:
+            self._abs_diff_sum -= abs(right - left)
+        if left is not None:
+            self._abs_diff_sum += abs(length - left)
+        if right is not None:
+            self._abs_diff_sum += abs(right - length)
+        keys.insert(pos, key)
+        self._cycle_lengths[key] = length
+        self._total += length
+        self._total_sq += length * length
+        self._length_counts[length - MIN_CYCLE] += 1
+
+    def _remove_cycle(self, key):
+        length = self._cycle_lengths.pop(key, None)
+        if length is None:
+            return
+        keys = self._cycle_keys
+        pos = bisect.bisect_left(keys, key)
+        del keys[pos]
+        left = self._cycle_lengths[keys[pos - 1]] if pos > 0 else None
+        right = self._cycle_lengths[keys[pos]] if pos < len(keys) else None
+        if left is not None:
+            self._abs_diff_sum -= abs(length - left)
+        if right is not None:
+            self._abs_diff_sum -= abs(right - length)
+        if left is not None and right is not None:
+            self._abs_diff_sum += abs(right - left)
+        self._total -= length
+        self._total_sq -= length * length
+        self._length_counts[length - MIN_CYCLE] -= 1
+
+    def calculate_weighted_average_cycle(self, n_recent=6):
+        """计算加权平均周期长度（最近的数据权重更高）"""
+        if len(self._starts) < 2 or not self._cycle_keys:
+            return DEFAULT_CYCLE
+
+        weighted_sum = 0
+        total_weight = 0
+        for key in self._cycle_keys[-n_recent:]:
+            # 周期在 period_starts 中的下标 = 该开始日首次出现的位置
+            idx = bisect.bisect_left(self._starts, key)
+            weight = (idx / len(self._starts)) * 2 + 0.5
+            weighted_sum += weight * self._cycle_lengths[key]
+            total_weight += weight
+
+        return weighted_sum / total_weight if total_weight > 0 else DEFAULT_CYCLE
+
+    def estimate_cycle_length(self):
+        """下一个周期的长度估计：默认加权平均，指定策略时由策略计算"""
+        if self.strategy is None:
+            return self.calculate_weighted_average_cycle()
+        return self.strategy.estimate(self._starts)
+
+    def calculate_avg_period_length(self):
+        """计算平均经期长度"""
+        if not self._period_length_count:
+            return 5
+        return self._period_length_sum / self._period_length_count
+
+    def get_cycle_statistics(self):
+        """获取周期统计数据"""
+        count = len(self._cycle_keys)
+        if len(self._starts) < 2 or not count:
+            return {}
+
+        present = [i for i, c in enumerate(self._length_counts) if c]
+        cycle_lengths = [self._cycle_lengths[key] for key in self._cycle_keys]
+        if count < 3:
+            irregularity = 0
+        else:
+            avg_diff = self._abs_diff_sum / (count - 1)
+            irregularity = round(min(100, (avg_diff / 25) * 100), 1)
+
+        return {
+            'avg_cycle': self._total / count,
+            'min_cycle': present[0] + MIN_CYCLE,
+            'max_cycle': present[-1] + MIN_CYCLE,
+            'std_cycle': std_from_moments(count, self._total, self._total_sq) if count > 1 else 0,
+            'cycle_count': count,
+            'cycle_lengths': cycle_lengths,
+            'irregularity': irregularity,
+        }
+
+# ============================================
+# 预测结果缓存
+# ============================================
+
+class PredictionCache:
+    """按数据版本缓存预测结果
+
+    状态栏、提醒、统计和图表共用同一份结果，数据版本（RecordStore.version）变化时才整体失效。
+    """
+
+    def __init__(self):
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._results = {}
+
+    def get(self, version, name, compute):
+        """返回 name 对应的结果，当前版本尚未计算时调用 compute()"""
+        if version != self.version:
+            self._results = {}
+            self.version = version
+        if name in self._results:
+            self.hits += 1
+            return self._results[name]
+        self.misses += 1
+        result = compute()
+        self._results[name] = result
+        return result
+
+    def stats(self):
+        """命中统计"""
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0, 'version': self.version}
+
+# ============================================
+# 日历上的预测日叠加层
+# ============================================
+
+MAX_FORECAST_CYCLES = 24  # 日历最多向后展开的周期数（约两年）
+
+
+class ForecastOverlay:
+    """把 iter_forecast() 的结果按月整理成位图，供日历逐日 O(1) 查询
+
+    只在翻到更远的月份时才从生成器继续取周期，已整理的月份直接复用。
+    数据变化后应整体丢弃（由 PredictionCache 按数据版本管理）。
+    """
+
+    PERIOD = 0
+    OVULATION = 1
+    FERTILE = 2
+
+    def __init__(self, forecast, max_cycles=MAX_FORECAST_CYCLES):
+        self._forecast = iter(forecast)
+        self._remaining = max_cycles
+        self._horizon = None    # 最近取出的周期的易孕期开始日序号，之后的周期都不早于它
+        self._days = {}         # 日序号 -> 三个标记位
+        self._months = {}       # (year, month) -> (经期位图, 排卵日位图, 易孕期位图)
+
+    def get(self, year, month):
+        """返回该月 (预测经期, 预测排卵日, 预测易孕期) 三个位图，第 d 天对应第 d-1 位"""
+        key = (year, month)
+        masks = self._months.get(key)
+        if masks is None:
+            first = datetime(year, month, 1).toordinal()
+            last = datetime(year + month // 12, month % 12 + 1, 1).toordinal() - 1
+            self._extend_to(last)
+            masks = [0, 0, 0]
+            for ordinal in range(first, last + 1):
+                flags = self._days.get(ordinal)
+                if flags:
+                    bit = 1 << (ordinal - first)
+                    for kind in range(3):
+                        if flags & (1 << kind):
+                            masks[kind] |= bit
+            masks = tuple(masks)
+            self._months[key] = masks
+        return masks
+
+    def _extend_to(self, ordinal):
+        # 周期按时间先后生成，易孕期开始晚于 ordinal 之后的周期不会再落到该日期之前
+        while self._remaining > 0 and (self._horizon is None or self._horizon <= ordinal):
+            cycle = next(self._forecast, None)
+            if cycle is None:
+                self._remaining = 0
+                break
+            self._remaining -= 1
+            period_start, period_end, ovulation_date, (fertile_start, fertile_end) = cycle
+            self._mark(self.PERIOD, period_start.toordinal(), period_end.toordinal())
+            self._mark(self.OVULATION, ovulation_date.toordinal(), ovulation_date.toordinal())
+            self._mark(self.FERTILE, fertile_start.toordinal(), fertile_end.toordinal())
+            self._horizon = fertile_start.toordinal()
+
+    def _mark(self, kind, start, end):
+        days = self._days
+        for ordinal in range(start, end + 1):
+            days[ordinal] = days.get(ordinal, 0) | (1 << kind)
+
+# ============================================
+# 多用户向量化批量计算
+# ============================================
+
+US_PER_DAY = 86400000000
+
+
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+NAT_INT = np.iinfo(np.int64).min  # NaT 在 int64 视图中的取值
+
+
+def pack_period_starts(start_lists):
+    """把多个用户的经期开始日期打包成 datetime64[D] 矩阵
+
+    start_lists 的元素可以是 datetime/date 或日序号。每行一个用户，升序排列，右侧用 NaT 填充。
+    """
+    width = max((len(starts) for starts in start_lists), default=0)
+    matrix = np.full((len(start_lists), width), NAT_INT, dtype=np.int64)
+    for row, starts in enumerate(start_lists):
+        if starts:
+            ordinals = sorted(d if isinstance(d, int) else d.toordinal() for d in starts)
+            matrix[row, :len(ordinals)] = ordinals
+    matrix[matrix != NAT_INT] -= EPOCH_ORDINAL
+    return matrix.view('datetime64[D]')
+
+
+def batch_cycle_statistics(starts, n_recent=6):
+    """对整个用户矩阵一次性计算周期统计，结果与逐个用户的 CyclePredictor 完全一致
+
+    starts 为 pack_period_starts 得到的矩阵。返回字典，每个值是长度为用户数的数组：
+    has_stats（对应 get_cycle_statistics() 非空）、avg_cycle、min_cycle、max_cycle、
+    std_cycle、cycle_count、irregularity、weighted_cycle（calculate_weighted_average_cycle）
+    以及 next_period_start（datetime64[us]，经期不足两次时为 NaT）。
+    """
+    users, width = starts.shape
+    if width < 2:
+        # 不足两列时补 NaT，保证下面的差分至少有一列
+        padding = np.full((users, 2 - width), np.datetime64('NaT'), dtype='datetime64[D]')
+        starts = np.concatenate([starts.astype('datetime64[D]'), padding], axis=1)
+        width = 2
+    present = ~np.isnat(starts)
+    counts = present.sum(axis=1)                      # len(period_starts)
+
+    days = starts.astype('int64')
+    diffs = np.diff(days, axis=1)                     # 第 j 列对应 period_starts[j+1] - period_starts[j]
+    valid = present[:, 1:] & (diffs >= MIN_CYCLE) & (diffs <= MAX_CYCLE)
+    lengths = np.where(valid, diffs, 0)
+    n_valid = valid.sum(axis=1)
+    has_stats = n_valid > 0
+    safe_n = np.maximum(n_valid, 1)
+
+    # 整数矩，avg/std 的舍入方式与标量实现相同
+    total = lengths.sum(axis=1)
+    total_sq = (lengths * lengths).sum(axis=1)
+    avg_cycle = np.where(has_stats, total / safe_n, np.nan)
+    std_cycle = np.where(n_valid > 1, np.sqrt(safe_n * total_sq - total * total) / safe_n, 0.0)
+    min_cycle = np.where(valid, diffs, MAX_CYCLE + 1).min(axis=1, initial=MAX_CYCLE + 1)
+    max_cycle = np.where(valid, diffs, MIN_CYCLE - 1).max(axis=1, initial=MIN_CYCLE - 1)
+
+    # 不规律性：有效周期之间（跳过无效周期）相邻差值的绝对值
+    columns = np.arange(width - 1)
+    last_valid = np.maximum.accumulate(np.where(valid, columns, -1), axis=1)
+    prev_valid = np.concatenate([np.full((users, 1), -1), last_valid[:, :-1]], axis=1)
+    has_prev = valid & (prev_valid >= 0)
+    prev_lengths = np.take_along_axis(lengths, np.maximum(prev_valid, 0), axis=1)
+    abs_diff_sum = np.where(has_prev, np.abs(lengths - prev_lengths), 0).sum(axis=1)
+    raw_score = np.minimum(100, (abs_diff_sum / np.maximum(n_valid - 1, 1) / 25) * 100)
+    # Python 的 round 与 np.round 在个别小数上结果不同，最后一步逐个用户取整
+    irregularity = np.array([round(score, 1) if n >= 3 else 0
+                             for score, n in zip(raw_score.tolist(), n_valid.tolist())])
+
+    # 加权平均：只取最近 n_recent 个有效周期，权重 = (i / 经期次数) * 2 + 0.5
+    remaining = np.cumsum(valid[:, ::-1], axis=1)[:, ::-1]   # 本列及之后的有效周期数
+    selected = valid & (remaining <= n_recent)
+    weights = (columns + 1) / np.maximum(counts, 1)[:, None] * 2 + 0.5
+    weighted_sum = np.zeros(users)
+    total_weight = np.zeros(users)
+    # 按列顺序累加，与标量实现的求和顺序一致（未选中的列加 0，不影响结果）
+    for j in range(width - 1):
+        weighted_sum += np.where(selected[:, j], weights[:, j] * lengths[:, j], 0.0)
+        total_weight += np.where(selected[:, j], weights[:, j], 0.0)
+    weighted_cycle = np.where(total_weight > 0,
+                              weighted_sum / np.where(total_weight > 0, total_weight, 1),
+                              float(DEFAULT_CYCLE))
+
+    # 下次经期开始 = 最后一次开始 + 加权平均周期，按 timedelta(days=浮点数) 的方式舍入到微秒
+    whole_days, day_fraction = np.modf(weighted_cycle)[::-1]
+    offset_us = whole_days.astype('int64') * US_PER_DAY + np.rint(day_fraction * US_PER_DAY).astype('int64')
+    last_start = starts[np.arange(users), np.maximum(counts - 1, 0)]
+    next_period_start = last_start.astype('datetime64[us]') + offset_us.astype('timedelta64[us]')
+    next_period_start[counts < 2] = np.datetime64('NaT')
+
+    return {
+        'has_stats': has_stats,
+        'avg_cycle': avg_cycle,
+        'min_cycle': np.where(has_stats, min_cycle, 0),
+        'max_cycle': np.where(has_stats, max_cycle, 0),
+        'std_cycle': std_cycle,
+        'cycle_count': n_valid,
+        'irregularity': irregularity,
+        'weighted_cycle': weighted_cycle,
+        'next_period_start': next_period_start,
+    }
@@ -0,0 +1,923 @@
+"""
+经期记录App - 数据存储层
+不依赖 Kivy，可在无界面环境下单独使用
+包含：追加写日志存储（快照 + 日志尾部）、SQLite 存储、带类型的记录模型、
+      日期区间索引、月份标记位图、症状频率索引、共享内存记录缓存
+"""
+
+import bisect
+import heapq
+import json
+import os
+import sqlite3
+import sys
+from collections import Counter
+from datetime import date as _date
+from functools import lru_cache
+
+# ============================================
+# 原子写入
+# ============================================
+
+# fsync 策略
+FSYNC_ALWAYS = 'always'      # 每次提交（日志追加、快照）都落盘
+FSYNC_SNAPSHOT = 'snapshot'  # 只对快照落盘，日志追加交给操作系统刷盘
+FSYNC_NEVER = 'never'        # 从不 fsync（仅用于测试和基准）
+
+
+def write_json_file(path, data, fsync=True, **dump_kwargs):
+    """写入 JSON 文件，fsync 为真时写完即落盘"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump_kwargs)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+
+
+def atomic_write_json(path, data, fsync=True, **dump_kwargs):
+    """先写临时文件再原子重命名，写入中途崩溃不会破坏原文件"""
+    tmp_path = path + '.tmp'
+    write_json_file(tmp_path, data, fsync, **dump_kwargs)
+    os.replace(tmp_path, path)
+    if fsync:
+        _fsync_dir(os.path.dirname(os.path.abspath(path)))
+
+
+def _fsync_dir(path):
+    # 让重命名本身也落盘；Windows 不支持对目录 fsync，忽略即可
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+# ============================================
+# 追加写日志存储
+# ============================================
+
+JOURNAL_SUFFIX = '.journal'
+COMPACTING_SUFFIX = '.compacting'  # 压缩中：日志已移到一旁，新快照尚未完整写好
+MERGED_SUFFIX = '.merged'          # 新快照（快照文件名 + .tmp）已完整写好，只差替换旧快照
+
+
+class JournalStorage:
+    """追加写日志存储
+
+    快照文件沿用原来的 JSON 数组格式（period_tracker_data.json），
+    新记录以一行一个 JSON 对象的形式追加到日志文件，保存一条记录只需 O(1) 的磁盘写入。
+    压缩（把快照和日志合并写成新快照，再清空日志）要重写整个快照，不在保存时进行，
+    由应用在启动和切到后台时调用 compact_if_needed()，日志行数达到阈值才执行。
+    快照通过临时文件 + 原子重命名写入，fsync 策略见 FSYNC_*。
+
+    压缩的每一步都由文件状态明确记录，崩溃恢复不比较记录内容（内容相同的记录可能是真实的重复保存）：
+    1. 日志重命名为 .compacting，之后的保存写入新的日志文件；
+    2. 旧快照 + .compacting 写成 快照.tmp 并落盘，再把 .compacting 重命名为 .merged；
+    3. 快照.tmp 替换旧快照，删除 .merged。
+    加载时若有 .compacting，说明新快照还没写好，按 快照 + .compacting + 日志 重放；
+    若有 .merged，快照.tmp 存在时它就是完整的新快照，否则旧快照已被替换。
+    """
+
+    def __init__(self, snapshot_path, journal_path=None, compact_threshold=500,
+                 fsync=FSYNC_ALWAYS):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or os.path.splitext(snapshot_path)[0] + JOURNAL_SUFFIX
+        self.compacting_path = self.journal_path + COMPACTING_SUFFIX
+        self.merged_path = self.journal_path + MERGED_SUFFIX
+        self.tmp_path = snapshot_path + '.tmp'
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self.journal_count = None  # 日志中的记录条数，首次加载时统计
+        self._torn_tail = False    # 日志末尾是否有未写完的半行
+
+    def load(self, repair=True):
+        """加载快照并重放日志尾部
+
+        repair 为假时只读：不补做中断的压缩（不改动任何文件），供批量预测、回测等离线读取使用。
+        """
+        records = self._read_base(repair)
+        tail = self._read_journal()
+        self.journal_count = len(tail)
+        records.extend(tail)
+        return records
+
+    def append(self, record):
+        """追加一条记录到日志"""
+        self.append_many([record])
+
+    def append_many(self, records):
+        """一次写入、一次 fsync 追加多条记录（组提交）"""
+        if not records:
+            return
+        if self.journal_count is None:
+            self.load()
+
+        data = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        if self._torn_tail:
+            # 先换行，避免新记录接在损坏的半行后面
+            data = '\n' + data
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            if self.fsync == FSYNC_ALWAYS:
+                os.fsync(f.fileno())
+        self._torn_tail = False
+        self.journal_count += len(records)
+
+    def compact(self):
+        """把日志合并进快照（步骤见类说明）"""
+        records = self.load()
+        if not os.path.exists(self.journal_path):
+            return
+        os.replace(self.journal_path, self.compacting_path)
+        self._sync_dir()
+        self.journal_count = 0
+        self._torn_tail = False
+        self._commit_snapshot(records)
+
+    def compact_if_needed(self):
+        """日志过长时压缩（启动和切到后台时调用）"""
+        if self.journal_count is None:
+            self.journal_count = len(self._read_journal())
+        if self.journal_count >= self.compact_threshold:
+            self.compact()
+
+    def signature(self):
+        """文件签名（修改时间 + 大小），用于判断数据是否被外部修改"""
+        return (_stat_signature(self.snapshot_path), _stat_signature(self.journal_path))
+
+    def clear(self):
+        """清除所有记录"""
+        for path in (self.compacting_path, self.merged_path):
+            _remove_if_exists(path)
+        self._truncate_journal()
+        self._write_snapshot([])
+        self.journal_count = 0
+
+    def paths(self):
+        """本存储可能用到的所有文件"""
+        return (self.snapshot_path, self.tmp_path, self.journal_path,
+                self.compacting_path, self.merged_path)
+
+    def _read_base(self, repair):
+        """快照，加上中断的压缩中已移到一旁的日志；repair 为真时顺便完成那次压缩"""
+        if os.path.exists(self.merged_path):
+            if os.path.exists(self.tmp_path):
+                # 新快照已完整写好，只差替换
+                if not repair:
+                    return self._read_json(self.tmp_path)
+                os.replace(self.tmp_path, self.snapshot_path)
+                self._sync_dir()
+            if repair:
+                os.remove(self.merged_path)
+            return self._read_snapshot()
+
+        records = self._read_snapshot()
+        if os.path.exists(self.compacting_path):
+            records.extend(self._read_lines(self.compacting_path)[0])
+            if repair:
+                self._commit_snapshot(records)
+        return records
+
+    def _commit_snapshot(self, records):
+        """.compacting 中的日志已包含在 records 中：写新快照并完成压缩"""
+        fsync = self.fsync != FSYNC_NEVER
+        write_json_file(self.tmp_path, records, fsync, ensure_ascii=False)
+        os.replace(self.compacting_path, self.merged_path)
+        self._sync_dir()
+        os.replace(self.tmp_path, self.snapshot_path)
+        self._sync_dir()
+        os.remove(self.merged_path)
+
+    def _sync_dir(self):
+        if self.fsync != FSYNC_NEVER:
+            _fsync_dir(os.path.dirname(os.path.abspath(self.snapshot_path)))
+
+    def _read_snapshot(self):
+        return self._read_json(self.snapshot_path)
+
+    def _read_json(self, path):
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _read_journal(self):
+        records, self._torn_tail = self._read_lines(self.journal_path)
+        return records
+
+    def _read_lines(self, path):
+        """读取一个日志文件，返回 (记录列表, 末尾是否有未写完的半行)"""
+        records = []
+        torn_tail = False
+        if not os.path.exists(path):
+            return records, torn_tail
+        with open(path, 'r', encoding='utf-8') as f:
+            for raw in f:
+                torn_tail = not raw.endswith('\n')
+                line = raw.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # 写入中途崩溃会留下半行，跳过即可
+                    print(f"跳过损坏的日志行: {line[:40]}", file=sys.stderr)
+        return records, torn_tail
+
+    def _write_snapshot(self, records):
+        # 不缩进：大数据量时缩进会让快照明显变大、写入变慢
+        atomic_write_json(self.snapshot_path, records, fsync=self.fsync != FSYNC_NEVER,
+                          ensure_ascii=False)
+
+    def _truncate_journal(self):
+        open(self.journal_path, 'w', encoding='utf-8').close()
+        self._torn_tail = False
+
+
+def _remove_if_exists(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _stat_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+# ============================================
+# SQLite 存储
+# ============================================
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT,
+    date TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    payload TEXT NOT NULL
+);
+DROP INDEX IF EXISTS idx_records_type;
+DROP INDEX IF EXISTS idx_records_date;
+DROP INDEX IF EXISTS idx_records_start_date;
+DROP INDEX IF EXISTS idx_records_end_date;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SQLiteStorage:
+    """SQLite 存储
+
+    每条记录的原始 JSON 保存在 payload 列，type/date/start_date/end_date 单独成列便于用 SQL 查看数据。
+    应用内的按日、按月、按类型查询都由 RecordStore 的内存索引完成，这里只负责整体加载和写入，
+    因此不再建二级索引（旧数据库中的索引在打开时删除，减少每次写入的开销）。
+
+    与 JSON 日志相比，整体加载和单次保存略慢，但每次提交都是完整的事务：不会留下写了一半的记录，
+    也不需要把日志合并进快照（数据量大时日志压缩要重写整个快照，耗时可达秒级）。
+
+    首次打开时若存在旧的 JSON 数据（快照 + 日志），会在一个事务内导入，原文件保留作为备份，
+    清除所有记录时一并删除。
+    SQLite 事务本身是原子的，fsync 策略映射为 PRAGMA synchronous。
+    """
+
+    SYNCHRONOUS = {FSYNC_ALWAYS: 'FULL', FSYNC_SNAPSHOT: 'NORMAL', FSYNC_NEVER: 'OFF'}
+
+    def __init__(self, db_path, legacy_path=None, fsync=FSYNC_ALWAYS):
+        self.db_path = db_path
+        self.legacy_path = legacy_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(f'PRAGMA synchronous = {self.SYNCHRONOUS[fsync]}')
+        self.conn.executescript(SQLITE_SCHEMA)
+        if legacy_path:
+            self._import_legacy(legacy_path)
+
+    def load(self):
+        """按写入顺序加载所有记录"""
+        rows = self.conn.execute('SELECT payload FROM records ORDER BY id')
+        return [json.loads(payload) for (payload,) in rows]
+
+    def append(self, record):
+        """写入一条记录"""
+        self.append_many([record])
+
+    def append_many(self, records):
+        """在一个事务中写入多条记录（组提交）"""
+        with self.conn:
+            for record in records:
+                self._insert(record)
+
+    def clear(self):
+        """清除所有记录
+
+        先删除旧 JSON 备份再清空数据表：删除备份失败时抛出异常，数据库保持不变，
+        不会出现表已清空、界面却仍显示旧数据的情况。
+        """
+        self._remove_legacy()
+        with self.conn:
+            self.conn.execute('DELETE FROM records')
+
+    def compact_if_needed(self):
+        """让 SQLite 按需更新查询统计信息"""
+        self.conn.execute('PRAGMA optimize')
+
+    def signature(self):
+        """其他连接提交修改后 data_version 会变化"""
+        return self.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def _insert(self, record):
+        start_date = record.get('start_date')
+        self.conn.execute(
+            'INSERT INTO records (type, date, start_date, end_date, payload) VALUES (?, ?, ?, ?, ?)',
+            (record.get('type'), record.get('date'), start_date,
+             record.get('end_date') or start_date,
+             json.dumps(record, ensure_ascii=False)))
+
+    def _import_legacy(self, legacy_path):
+        imported = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'legacy_imported'").fetchone()
+        if imported:
+            return
+        records = JournalStorage(legacy_path).load(repair=False) if os.path.exists(legacy_path) else []
+        with self.conn:
+            for record in records:
+                self._insert(record)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_imported', ?)",
+                (legacy_path,))
+        if records:
+            print(f"已从 {legacy_path} 导入 {len(records)} 条记录")
+
+    def _remove_legacy(self):
+        """删除导入时保留的旧 JSON 快照和日志，清除后不留下旧数据（删除失败时抛出异常）"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'legacy_imported'").fetchone()
+        paths = {path for path in (self.legacy_path, row[0] if row else None) if path}
+        for path in paths:
+            for leftover in JournalStorage(path).paths():
+                _remove_if_exists(leftover)
+
+
+def load_records_file(path):
+    """只读加载单个数据文件：.db 为 SQLite，其它按 JSON 快照（含同名日志）处理"""
+    if path.endswith('.db'):
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            rows = conn.execute('SELECT payload FROM records ORDER BY id')
+            return [json.loads(payload) for (payload,) in rows]
+        finally:
+            conn.close()
+    return JournalStorage(path).load(repair=False)
+
+
+def open_storage(backend, data_file):
+    """按名称创建存储后端：'sqlite'（默认）或 'journal'
+
+    默认用 SQLite：每次保存是一个完整事务，也没有日志存储那样需要重写整个快照的压缩步骤；
+    整体加载和单次保存比日志存储稍慢（见 scripts/bench_backends.py）。
+    """
+    if backend == 'journal':
+        return JournalStorage(data_file)
+    if backend == 'sqlite':
+        db_path = os.path.splitext(data_file)[0] + '.db'
+        return SQLiteStorage(db_path, legacy_path=data_file)
+    raise ValueError(f"未知的存储后端: {backend}")
+
+# ============================================
+# 记录模型
+# ============================================
+
+def parse_ordinal(date_str):
+    """'%Y-%m-%d' 字符串转为日序号，无法解析时返回 None"""
+    try:
+        return _date.fromisoformat(date_str).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=4096)
+def ordinal_to_str(ordinal):
+    """日序号转为 '%Y-%m-%d' 字符串"""
+    return _date.fromordinal(ordinal).isoformat()
+
+
+class PeriodRecord:
+    """经期记录，日期以日序号保存（只读）"""
+
+    __slots__ = ('start', 'end', 'timestamp', 'extra')
+    type = 'period'
+
+    def __init__(self, start, end, timestamp=None, extra=None):
+        self.start = start          # 开始日序号
+        self.end = end              # 结束日序号，结束日期无法解析时为 None
+        self.timestamp = timestamp
+        self.extra = extra          # 未识别的字段，原样保留
+
+    @property
+    def start_date(self):
+        return ordinal_to_str(self.start)
+
+    @property
+    def end_date(self):
+        return ordinal_to_str(self.end) if self.end is not None else ''
+
+    @property
+    def date_key(self):
+        return self.start_date
+
+
+class MoodSymptomRecord:
+    """心情/症状记录（只读），心情和症状文本已驻留（intern）"""
+
+    __slots__ = ('day', 'mood', 'symptoms', 'timestamp', 'extra')
+    type = 'mood_symptom'
+
+    def __init__(self, day, mood=None, symptoms=(), timestamp=None, extra=None):
+        self.day = day
+        self.mood = mood
+        self.symptoms = symptoms    # 驻留字符串组成的元组
+        self.timestamp = timestamp
+        self.extra = extra
+
+    @property
+    def date(self):
+        return ordinal_to_str(self.day)
+
+    date_key = date
+
+
+class IntimacyRecord:
+    """爱爱记录（只读）"""
+
+    __slots__ = ('day', 'intimacy_type', 'note', 'timestamp', 'extra')
+    type = 'intimacy'
+
+    def __init__(self, day, intimacy_type=None, note='', timestamp=None, extra=None):
+        self.day = day
+        self.intimacy_type = intimacy_type
+        self.note = note
+        self.timestamp = timestamp
+        self.extra = extra
+
+    @property
+    def date(self):
+        return ordinal_to_str(self.day)
+
+    date_key = date
+
+
+class OtherRecord:
+    """未知类型或日期无法解析的记录，保留原始字典"""
+
+    __slots__ = ('data', 'day')
+
+    def __init__(self, data):
+        self.data = data
+        self.day = parse_ordinal(data.get('date'))
+
+    @property
+    def type(self):
+        return self.data.get('type')
+
+    @property
+    def date_key(self):
+        return self.data.get('date') or self.data.get('start_date')
+
+
+
+_PERIOD_KEYS = {'start_date', 'end_date', 'type', 'timestamp'}
+_MOOD_KEYS = {'date', 'mood', 'symptoms', 'type', 'timestamp'}
+_INTIMACY_KEYS = {'date', 'type', 'intimacy_type', 'note', 'timestamp'}
+
+
+def _extra(data, known):
+    if data.keys() <= known:
+        return None
+    return {k: v for k, v in data.items() if k not in known}
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def parse_record(data):
+    """字典记录转为带类型的记录，日期只在这里解析一次"""
+    record_type = data.get('type')
+    if record_type == 'period':
+        start_date = data.get('start_date')
+        start = parse_ordinal(start_date)
+        if start is not None:
+            end_date = data.get('end_date') or start_date
+            end = parse_ordinal(end_date)
+            extra = _extra(data, _PERIOD_KEYS)
+            if end is None:
+                extra = dict(extra or {}, end_date=data.get('end_date'))
+            return PeriodRecord(start, end, data.get('timestamp'), extra)
+    elif record_type == 'mood_symptom':
+        day = parse_ordinal(data.get('date'))
+        if day is not None:
+            symptoms = tuple(_intern(s) for s in data.get('symptoms') or ())
+            return MoodSymptomRecord(day, _intern(data.get('mood')), symptoms,
+                                     data.get('timestamp'), _extra(data, _MOOD_KEYS))
+    elif record_type == 'intimacy':
+        day = parse_ordinal(data.get('date'))
+        if day is not None:
+            return IntimacyRecord(day, _intern(data.get('intimacy_type')), data.get('note', ''),
+                                  data.get('timestamp'), _extra(data, _INTIMACY_KEYS))
+    return OtherRecord(data)
+
+
+def as_records(records):
+    """接受字典或已带类型的记录，统一返回带类型的记录列表"""
+    return [parse_record(r) if isinstance(r, dict) else r for r in records]
+
+# ============================================
+# 日期区间索引
+# ============================================
+
+
+class DateIndex:
+    """按日期查找记录的内存索引
+
+    经期区间按开始日序号排序，并保存结束日的前缀最大值（max-end 增强），
+    查询某日时二分定位最后一个开始日 <= 该日的位置，再向前扫描到前缀最大值小于该日为止，
+    复杂度 O(log n + k)。心情/爱爱等单日记录用 日序号 -> 记录位置 的字典，O(1) 查询。
+    索引里保存的是记录在 RecordStore 元组中的位置，新增记录时增量插入，不整体重建。
+    """
+
+    def __init__(self):
+        self.starts = []   # 经期开始日序号（升序）
+        self.ends = []     # 对应的结束日序号
+        self.max_end = []  # ends 的前缀最大值
+        self.seqs = []     # 对应的记录位置
+        self.points = {}   # 日序号 -> [记录位置]
+
+    @classmethod
+    def build(cls, records):
+        index = cls()
+        for seq, record in enumerate(records):
+            index.add(seq, record)
+        return index
+
+    def add(self, seq, record):
+        """增量加入一条记录"""
+        if isinstance(record, PeriodRecord):
+            if record.end is not None:
+                self._add_interval(record.start, record.end, seq)
+        elif record.day is not None:
+            self.points.setdefault(record.day, []).append(seq)
+
+    def _add_interval(self, start, end, seq):
+        pos = bisect.bisect_right(self.starts, start)
+        self.starts.insert(pos, start)
+        self.ends.insert(pos, end)
+        self.seqs.insert(pos, seq)
+        prev_max = self.max_end[pos - 1] if pos > 0 else end
+        self.max_end.insert(pos, max(prev_max, end))
+        # 前缀最大值单调不减，后面的值一旦不小于 end 就无需继续更新
+        for i in range(pos + 1, len(self.max_end)):
+            if self.max_end[i] >= end:
+                break
+            self.max_end[i] = end
+
+    def lookup(self, start, end=None):
+        """返回与 [start, end] 有交集的记录位置（升序），end 默认等于 start"""
+        if end is None:
+            end = start
+        found = []
+        i = bisect.bisect_right(self.starts, end) - 1
+        while i >= 0 and self.max_end[i] >= start:
+            if self.ends[i] >= start:
+                found.append(self.seqs[i])
+            i -= 1
+        if end - start < len(self.points):
+            for day in range(start, end + 1):
+                found.extend(self.points.get(day, ()))
+        else:
+            for day, seqs in self.points.items():
+                if start <= day <= end:
+                    found.extend(seqs)
+        found.sort()
+        return found
+
+# ============================================
+# 月份标记位图
+# ============================================
+
+class MonthFlags:
+    """按月保存每天的记录标记
+
+    每个月用三个整数位图表示经期/心情/爱爱，第 d 天对应第 d-1 位，
+    日历渲染时每格只需一次位运算，不再逐条扫描记录、解析日期。
+    """
+
+    PERIOD = 0
+    MOOD = 1
+    INTIMACY = 2
+
+    def __init__(self):
+        self.months = {}  # (年, 月) -> [经期位图, 心情位图, 爱爱位图]
+
+    @classmethod
+    def build(cls, records):
+        flags = cls()
+        for record in records:
+            flags.add(record)
+        return flags
+
+    def add(self, record):
+        """增量加入一条记录"""
+        if isinstance(record, PeriodRecord):
+            if record.end is not None:
+                self._set_range(self.PERIOD, record.start, record.end)
+        elif isinstance(record, MoodSymptomRecord):
+            self._set_range(self.MOOD, record.day, record.day)
+        elif isinstance(record, IntimacyRecord):
+            self._set_range(self.INTIMACY, record.day, record.day)
+
+    def _set_range(self, kind, start, end):
+        if start == end:
+            day = _date.fromordinal(start)
+            masks = self.months.setdefault((day.year, day.month), [0, 0, 0])
+            masks[kind] |= 1 << (day.day - 1)
+            return
+        # 按月切分区间，每个月一次位运算
+        while start <= end:
+            first = _date.fromordinal(start)
+            if first.month == 12:
+                next_month = _date(first.year + 1, 1, 1).toordinal()
+            else:
+                next_month = _date(first.year, first.month + 1, 1).toordinal()
+            last = min(end, next_month - 1)
+            masks = self.months.setdefault((first.year, first.month), [0, 0, 0])
+            masks[kind] |= ((1 << (last - start + 1)) - 1) << (first.day - 1)
+            start = last + 1
+
+    def get(self, year, month):
+        """返回 (经期位图, 心情位图, 爱爱位图)"""
+        return tuple(self.months.get((year, month), (0, 0, 0)))
+
+# ============================================
+# 症状频率索引
+# ============================================
+
+@lru_cache(maxsize=1024)
+def normalize_symptom(symptom):
+    """清理症状文本（去掉"其他: "前缀和首尾空白），返回驻留字符串，清理后为空时返回 None"""
+    clean = symptom.replace('其他: ', '').strip()
+    return sys.intern(clean) if clean else None
+
+
+class SymptomIndex:
+    """症状出现次数：全部时间一个计数器，另按月各一个计数器
+
+    写入/删除记录时增量更新，最近 N 个月的统计由按月计数器合并得到，不再扫描记录。
+    另外记下每个症状（全部时间和每个月内）第一次出现的记录序号，次数相同时按它排序，
+    与原来逐条扫描后稳定排序的结果一致。删除记录后某个症状计数归零时才清除它的序号。
+    """
+
+    def __init__(self):
+        self.total = Counter()
+        self.first = {}        # 症状 -> 第一次出现的记录序号
+        self.months = {}       # (年, 月) -> Counter
+        self.month_first = {}  # (年, 月) -> {症状: 该月第一次出现的记录序号}
+        self._seq = 0
+
+    @classmethod
+    def build(cls, records):
+        index = cls()
+        for record in records:
+            index.add(record)
+        return index
+
+    def add(self, record):
+        """增量加入一条记录（只统计心情/症状记录）"""
+        self._update(record, 1)
+
+    def remove(self, record):
+        """删除一条记录的计数"""
+        self._update(record, -1)
+
+    def _update(self, record, delta):
+        if not isinstance(record, MoodSymptomRecord) or not record.symptoms:
+            return
+        seq = self._seq
+        if delta > 0:
+            self._seq += 1
+        day = _date.fromordinal(record.day)
+        key_month = (day.year, day.month)
+        month = self.months.setdefault(key_month, Counter())
+        month_first = self.month_first.setdefault(key_month, {})
+        for symptom in record.symptoms:
+            key = normalize_symptom(symptom)
+            if key is None:
+                continue
+            for counter, first in ((self.total, self.first), (month, month_first)):
+                counter[key] += delta
+                if delta > 0:
+                    first.setdefault(key, seq)
+                if counter[key] <= 0:
+                    del counter[key]
+                    first.pop(key, None)
+        if not month:
+            del self.months[key_month]
+            del self.month_first[key_month]
+
+    def _window(self, months, today):
+        """(计数, 第一次出现的序号)，范围同 counts()"""
+        if months is None:
+            return self.total, self.first
+        today = today or _date.today()
+        index = today.year * 12 + today.month - 1
+        combined = Counter()
+        first = {}
+        for i in range(index - months + 1, index + 1):
+            key_month = (i // 12, i % 12 + 1)
+            month = self.months.get(key_month)
+            if month:
+                combined.update(month)
+                for key, seq in self.month_first[key_month].items():
+                    if seq < first.get(key, seq + 1):
+                        first[key] = seq
+        return combined, first
+
+    def counts(self, months=None, today=None):
+        """全部时间（months 为 None）或截至 today 所在月份的最近 months 个月的计数"""
+        return self._window(months, today)[0]
+
+    def top(self, k=5, months=None, today=None):
+        """出现次数最多的 k 个症状 {症状: 次数}，次数相同时先出现的在前"""
+        counter, first = self._window(months, today)
+        return dict(heapq.nlargest(k, counter.items(),
+                                   key=lambda item: (item[1], -first[item[0]])))
+
+# ============================================
+# 共享内存记录缓存
+# ============================================
+
+class RecordStore:
+    """进程内共享的记录缓存
+
+    由 PeriodTrackerApp 持有，只在首次访问、文件签名变化或经由本对象写入时更新，
+    各屏幕拿到的是同一份不可变视图（带类型的只读记录组成的元组，日期在加载时解析一次）。
+    version 在每次数据变化时递增，可作为下游缓存的键。
+    按日期的查询由 DateIndex 提供，日历每天的标记由 MonthFlags 提供，
+    症状频率由 SymptomIndex 提供，按类型的记录元组由 _by_type 提供。
+    这些索引都在写入时增量更新，外部修改后才整体重建。
+
+    组提交：commit_window > 0 且提供了 scheduler(callback, delay) 时，写入先进入内存视图，
+    窗口期内连续的多次保存合并为一次磁盘写入；应用进入后台或退出前应调用 flush()。
+    """
+
+    def __init__(self, storage, commit_window=0, scheduler=None):
+        self.storage = storage
+        self.commit_window = commit_window
+        self.scheduler = scheduler
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self._records = None
+        self._signature = None
+        self._index = None
+        self._month_flags = None
+        self._symptoms = None
+        self._by_type = None  # 记录类型 -> 该类型记录的元组（按写入顺序）
+        self._pending = []
+        self._flush_scheduled = False
+
+    def records(self):
+        """返回所有记录的不可变视图"""
+        if self._records is not None and self._pending:
+            # 有未落盘的写入时以内存为准
+            self.hits += 1
+            return self._records
+        signature = self.storage.signature()
+        if self._records is not None and signature == self._signature:
+            self.hits += 1
+            return self._records
+
+        self.misses += 1
+        self._records = tuple(parse_record(r) for r in self.storage.load())
+        self._signature = signature
+        self._index = None
+        self._month_flags = None
+        self._symptoms = None
+        self._by_type = None
+        self.version += 1
+        return self._records
+
+    def append(self, record):
+        """写入一条记录并同步更新内存视图"""
+        records = self.records()
+        record = dict(record)
+        if self.commit_window > 0 and self.scheduler is not None:
+            self._pending.append(record)
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                self.scheduler(self.flush, self.commit_window)
+        else:
+            self.storage.append(record)
+            self._signature = self.storage.signature()
+
+        record = parse_record(record)
+        self._records = records + (record,)
+        if self._index is not None:
+            self._index.add(len(records), record)
+        if self._month_flags is not None:
+            self._month_flags.add(record)
+        if self._symptoms is not None:
+            self._symptoms.add(record)
+        if self._by_type is not None:
+            self._by_type[record.type] = self._by_type.get(record.type, ()) + (record,)
+        self.version += 1
+
+    def flush(self):
+        """把窗口期内积累的写入一次性落盘"""
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+        pending = self._pending
+        # 写入失败时保留待写记录，下次 flush 重试
+        self.storage.append_many(pending)
+        self._pending = []
+        self._signature = self.storage.signature()
+        self.flushes += 1
+
+    def compact_if_needed(self):
+        """让存储按需整理（如压缩日志），整理前与磁盘一致的内存视图整理后仍然有效"""
+        in_sync = self._records is not None and self.storage.signature() == self._signature
+        self.storage.compact_if_needed()
+        if in_sync:
+            self._signature = self.storage.signature()
+
+    def records_for_date(self, date):
+        """获取指定日期的记录"""
+        return self.records_in_range(date, date)
+
+    def records_in_range(self, start, end):
+        """获取与 [start, end] 有交集的记录（如某个月）"""
+        records = self.records()
+        if self._index is None:
+            self._index = DateIndex.build(records)
+        seqs = self._index.lookup(start.toordinal(), end.toordinal())
+        return tuple(records[seq] for seq in seqs)
+
+    def month_flags(self, year, month):
+        """某月每天的 (经期, 心情, 爱爱) 位图"""
+        records = self.records()
+        if self._month_flags is None:
+            self._month_flags = MonthFlags.build(records)
+        return self._month_flags.get(year, month)
+
+    def top_symptoms(self, k=5, months=None, today=None):
+        """出现次数最多的 k 个症状，months 为 3/6/12 等时只统计最近几个月"""
+        records = self.records()
+        if self._symptoms is None:
+            self._symptoms = SymptomIndex.build(records)
+        return self._symptoms.top(k, months, today)
+
+    def records_of_type(self, record_type):
+        """获取某一类型的全部记录（包括组提交窗口内尚未落盘的记录）"""
+        records = self.records()
+        if self._by_type is None:
+            by_type = {}
+            for record in records:
+                by_type.setdefault(record.type, []).append(record)
+            self._by_type = {key: tuple(group) for key, group in by_type.items()}
+        return self._by_type.get(record_type, ())
+
+    def clear(self):
+        """清除所有记录
+
+        存储清除失败时也丢弃内存视图（部分数据可能已被删除），下次访问时按磁盘上的实际内容重新加载。
+        """
+        self._pending = []
+        try:
+            self.storage.clear()
+        finally:
+            self._records = None
+            self._signature = None
+            self._index = None
+            self._month_flags = None
+            self._symptoms = None
+            self._by_type = None
+            self.version += 1
+
+    def stats(self):
+        """缓存命中统计"""
+        return {'hits': self.hits, 'misses': self.misses, 'version': self.version,
+                'flushes': self.flushes, 'pending': len(self._pending)}
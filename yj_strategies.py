@@ -0,0 +1,212 @@
+"""
+经期记录App - 可替换的周期预测策略
+不依赖 Kivy。每个策略根据升序的经期开始日序号估计下一个周期的长度，
+可以传给 CyclePredictor(records, strategy=...)，也可以在同一段历史上并排回测比较。
+
+包含：加权平均（现有算法）、指数加权移动平均、近期中位数、截尾均值、一维卡尔曼滤波
+"""
+
+import math
+import time
+
+from yj_predictor import DEFAULT_CYCLE, LUTEAL_DAYS, MAX_CYCLE, MIN_CYCLE
+
+# ============================================
+# 策略接口
+# ============================================
+
+class CycleStrategy:
+    """预测策略基类
+
+    子类实现 estimate_lengths()，输入为有效周期长度（按时间先后），
+    需要周期位置的策略（如加权平均）改写 estimate()。
+    min_cycle/max_cycle 为有效周期范围，luteal_days 为预测排卵日时使用的黄体期天数。
+    """
+
+    name = 'base'
+
+    def __init__(self, min_cycle=MIN_CYCLE, max_cycle=MAX_CYCLE, luteal_days=LUTEAL_DAYS):
+        self.min_cycle = min_cycle
+        self.max_cycle = max_cycle
+        self.luteal_days = luteal_days
+
+    def valid_cycles(self, starts):
+        """有效周期列表 [(长度, 周期结束处的下标)]"""
+        lo, hi = self.min_cycle, self.max_cycle
+        return [(starts[i] - starts[i - 1], i) for i in range(1, len(starts))
+                if lo <= starts[i] - starts[i - 1] <= hi]
+
+    def estimate(self, starts):
+        """估计下一个周期的长度（天）；没有有效周期时返回默认值"""
+        lengths = [length for length, _ in self.valid_cycles(starts)]
+        if not lengths:
+            return DEFAULT_CYCLE
+        return self.estimate_lengths(lengths)
+
+    def estimate_lengths(self, lengths):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name})"
+
+
+class WeightedAverageStrategy(CycleStrategy):
+    """现有算法：最近 n_recent 个有效周期加权平均，权重 = (下标 / 经期次数) * 2 + 0.5"""
+
+    name = 'weighted'
+
+    def __init__(self, n_recent=6, **kwargs):
+        super().__init__(**kwargs)
+        self.n_recent = n_recent
+
+    def estimate(self, starts):
+        if len(starts) < 2:
+            return DEFAULT_CYCLE
+        cycles = self.valid_cycles(starts)
+        if not cycles:
+            return DEFAULT_CYCLE
+        weighted_sum = 0
+        total_weight = 0
+        for length, idx in cycles[-self.n_recent:]:
+            weight = (idx / len(starts)) * 2 + 0.5
+            weighted_sum += weight * length
+            total_weight += weight
+        return weighted_sum / total_weight if total_weight > 0 else DEFAULT_CYCLE
+
+
+class EWMAStrategy(CycleStrategy):
+    """指数加权移动平均，alpha 越大越偏向最近的周期"""
+
+    name = 'ewma'
+
+    def __init__(self, alpha=0.3, **kwargs):
+        super().__init__(**kwargs)
+        self.alpha = alpha
+
+    def estimate_lengths(self, lengths):
+        level = lengths[0]
+        for length in lengths[1:]:
+            level += self.alpha * (length - level)
+        return level
+
+
+class MedianStrategy(CycleStrategy):
+    """最近 n_recent 个有效周期的中位数，不受个别异常周期影响"""
+
+    name = 'median'
+
+    def __init__(self, n_recent=6, **kwargs):
+        super().__init__(**kwargs)
+        self.n_recent = n_recent
+
+    def estimate_lengths(self, lengths):
+        recent = sorted(lengths[-self.n_recent:])
+        mid = len(recent) // 2
+        if len(recent) % 2:
+            return recent[mid]
+        return (recent[mid - 1] + recent[mid]) / 2
+
+
+class TrimmedMeanStrategy(CycleStrategy):
+    """最近 n_recent 个有效周期去掉两端各 trim 比例后的均值"""
+
+    name = 'trimmed'
+
+    def __init__(self, n_recent=12, trim=0.2, **kwargs):
+        super().__init__(**kwargs)
+        self.n_recent = n_recent
+        self.trim = trim
+
+    def estimate_lengths(self, lengths):
+        recent = sorted(lengths[-self.n_recent:])
+        cut = int(len(recent) * self.trim)
+        if cut and len(recent) > 2 * cut:
+            recent = recent[cut:-cut]
+        return sum(recent) / len(recent)
+
+
+class KalmanStrategy(CycleStrategy):
+    """一维卡尔曼滤波（局部水平模型）
+
+    周期长度 = 缓慢漂移的真实水平 + 观测噪声；process_var 为水平每个周期的漂移方差，
+    measurement_var 为单个周期的波动方差。
+    """
+
+    name = 'kalman'
+
+    def __init__(self, process_var=1.0, measurement_var=9.0, **kwargs):
+        super().__init__(**kwargs)
+        self.process_var = process_var
+        self.measurement_var = measurement_var
+
+    def estimate_lengths(self, lengths):
+        level = lengths[0]
+        variance = self.measurement_var
+        for length in lengths[1:]:
+            variance += self.process_var
+            gain = variance / (variance + self.measurement_var)
+            level += gain * (length - level)
+            variance *= 1 - gain
+        return level
+
+
+def default_strategies(**kwargs):
+    """所有内置策略的默认配置，kwargs（有效周期范围、黄体期天数）对每个策略生效"""
+    return [
+        WeightedAverageStrategy(**kwargs),
+        EWMAStrategy(**kwargs),
+        MedianStrategy(**kwargs),
+        TrimmedMeanStrategy(**kwargs),
+        KalmanStrategy(**kwargs),
+    ]
+
+# ============================================
+# 并排回测
+# ============================================
+
+def evaluate_strategy(strategy, starts, plausible_only=True):
+    """在一段升序开始日序号上回测策略，返回 (误差列表, 每次估计的平均耗时秒数)
+
+    在第 m 个开始日之前只用 starts[:m] 估计，误差 = 估计的周期 - 实际间隔。
+    plausible_only 的含义与 yj_backtest.backtest_starts 相同。
+    """
+    errors = []
+    elapsed = 0.0
+    calls = 0
+    for m in range(2, len(starts)):
+        actual = starts[m] - starts[m - 1]
+        if plausible_only and not MIN_CYCLE <= actual <= MAX_CYCLE:
+            continue
+        history = starts[:m]
+        t0 = time.perf_counter()
+        estimate = strategy.estimate(history)
+        elapsed += time.perf_counter() - t0
+        calls += 1
+        errors.append(estimate - actual)
+    return errors, (elapsed / calls if calls else 0.0)
+
+
+def rank_strategies(strategies, histories, plausible_only=True):
+    """在多段历史上并排回测，按平均绝对误差从小到大返回每个策略的汇总"""
+    results = []
+    for strategy in strategies:
+        errors = []
+        latency_sum = 0.0
+        latency_count = 0
+        for starts in histories:
+            history_errors, latency = evaluate_strategy(strategy, starts, plausible_only)
+            errors.extend(history_errors)
+            if history_errors:
+                latency_sum += latency * len(history_errors)
+                latency_count += len(history_errors)
+        n = len(errors)
+        results.append({
+            'strategy': strategy.name,
+            'predictions': n,
+            'mae': sum(abs(e) for e in errors) / n if n else None,
+            'bias': sum(errors) / n if n else None,
+            'rmse': math.sqrt(sum(e * e for e in errors) / n) if n else None,
+            'latency_us': latency_sum / latency_count * 1e6 if latency_count else None,
+        })
+    results.sort(key=lambda r: (r['mae'] is None, r['mae']))
+    return results